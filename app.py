@@ -1,13 +1,12 @@
 import streamlit as st
-import joblib
 import pandas as pd
-import sqlite3
-import numpy as np
 from datetime import datetime
+from concurrent.futures import TimeoutError
 
-# Load the trained model and vectorizer
-model = joblib.load('career_recommendation_model.pkl')
-vectorizer = joblib.load('vectorizer.pkl')
+from config import MARKET_INSIGHTS_TTL, PREDICT_TIMEOUT, SIMILAR_TIMEOUT
+from pipeline import iter_job_details, submit
+from queries import get_market_insights, get_postings_by_ids
+from recommender import predict_job, similar_postings
 
 # Configure page
 st.set_page_config(
@@ -42,55 +41,47 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
-def get_db_connection():
-    return sqlite3.connect("career_guidance.db")
+# Market insights change only when postings are ingested; share them across sessions for a while
+@st.cache_data(ttl=MARKET_INSIGHTS_TTL)
+def load_market_insights():
+    return get_market_insights()
 
-def predict_job(description):
-    description_vectorized = vectorizer.transform([description])
-    prediction = model.predict(description_vectorized)
-    # Get prediction probabilities
-    probs = model.predict_proba(description_vectorized)
-    top_3_indices = np.argsort(probs[0])[-3:][::-1]
-    top_3_probs = probs[0][top_3_indices]
-    top_3_jobs = [str(model.classes_[i]) for i in top_3_indices]
-    return top_3_jobs, top_3_probs
 
-def get_job_details(job_title):
-    conn = get_db_connection()
-    query = """
-    SELECT p.title, p.description, p.min_salary, p.max_salary, 
-           p.location, p.company_name, p.skills_desc, p.formatted_experience_level,
-           p.remote_allowed, p.formatted_work_type, p.views, p.applies,
-           ROUND(AVG(p.min_salary), 2) as avg_min_salary,
-           ROUND(AVG(p.max_salary), 2) as avg_max_salary
-    FROM postings p
-    WHERE p.title LIKE ?
-    GROUP BY p.title
-    LIMIT 5
-    """
-    try:
-        job_details = pd.read_sql_query(query, conn, params=('%' + str(job_title) + '%',))
-        return job_details if not job_details.empty else None
-    finally:
-        conn.close()
-
-def get_market_insights():
-    conn = get_db_connection()
-    query = """
-    SELECT 
-        formatted_experience_level, 
-        ROUND(AVG(med_salary), 2) as avg_salary,
-        COUNT(*) as job_count,
-        ROUND(AVG(views), 2) as avg_views,
-        ROUND(AVG(applies), 2) as avg_applies
-    FROM postings
-    WHERE formatted_experience_level IS NOT NULL
-    GROUP BY formatted_experience_level
-    """
-    try:
-        return pd.read_sql_query(query, conn)
-    finally:
-        conn.close()
+def render_job_details(job_details, match_percentage):
+    for _, job_data in job_details.iterrows():
+        with st.expander(f"🌟 {job_data['title']} (Match: {match_percentage}%)", expanded=True):
+            # Job Overview
+            st.markdown("#### 📋 Job Overview")
+            cols = st.columns(4)
+            with cols[0]:
+                st.metric("Company", job_data['company_name'])
+            with cols[1]:
+                st.metric("Location", job_data['location'])
+            with cols[2]:
+                st.metric("Experience", job_data['formatted_experience_level'])
+            with cols[3]:
+                st.metric("Work Type", job_data['formatted_work_type'])
+            
+            # Salary Information
+            if pd.notna(job_data['min_salary']) and pd.notna(job_data['max_salary']):
+                st.markdown("#### 💰 Compensation")
+                salary_cols = st.columns(2)
+                with salary_cols[0]:
+                    st.metric("Minimum Salary", f"${float(job_data['min_salary']):,.2f}")
+                with salary_cols[1]:
+                    st.metric("Maximum Salary", f"${float(job_data['max_salary']):,.2f}")
+            
+            # Job Description
+            st.markdown("#### 📝 Description")
+            st.write(job_data['description'])
+            
+            # Required Skills
+            if pd.notna(job_data['skills_desc']):
+                st.markdown("#### 🎯 Required Skills")
+                skills = job_data['skills_desc'].split(',')
+                skill_cols = st.columns(3)
+                for i, skill in enumerate(skills):
+                    skill_cols[i % 3].markdown(f"- {skill.strip()}")
 
 # Sidebar with user profile
 with st.sidebar:
@@ -166,50 +157,49 @@ elif page == "🚀 Career Explorer":
     if st.button("🔍 Analyze My Profile"):
         if user_description:
             try:
+                # The similar postings need only the profile text; look them up alongside the prediction
+                similar_future = submit(similar_postings, user_description)
                 with st.spinner("🤖 AI is analyzing your profile..."):
-                    predicted_jobs, probabilities = predict_job(user_description)
+                    predicted_jobs, probabilities = submit(predict_job, user_description).result(timeout=PREDICT_TIMEOUT)
                 
                 st.success("### 🎯 Career Recommendations")
                 
-                for job, prob in zip(predicted_jobs, probabilities):
-                    match_percentage = int(prob * 100)
-                    job_details = get_job_details(job)
-                    
-                    if job_details is not None:
-                        for _, job_data in job_details.iterrows():
-                            with st.expander(f"🌟 {job_data['title']} (Match: {match_percentage}%)", expanded=True):
-                                # Job Overview
-                                st.markdown("#### 📋 Job Overview")
-                                cols = st.columns(4)
-                                with cols[0]:
-                                    st.metric("Company", job_data['company_name'])
-                                with cols[1]:
-                                    st.metric("Location", job_data['location'])
-                                with cols[2]:
-                                    st.metric("Experience", job_data['formatted_experience_level'])
-                                with cols[3]:
-                                    st.metric("Work Type", job_data['formatted_work_type'])
-                                
-                                # Salary Information
-                                if pd.notna(job_data['min_salary']) and pd.notna(job_data['max_salary']):
-                                    st.markdown("#### 💰 Compensation")
-                                    salary_cols = st.columns(2)
-                                    with salary_cols[0]:
-                                        st.metric("Minimum Salary", f"${float(job_data['min_salary']):,.2f}")
-                                    with salary_cols[1]:
-                                        st.metric("Maximum Salary", f"${float(job_data['max_salary']):,.2f}")
-                                
-                                # Job Description
-                                st.markdown("#### 📝 Description")
-                                st.write(job_data['description'])
-                                
-                                # Required Skills
-                                if pd.notna(job_data['skills_desc']):
-                                    st.markdown("#### 🎯 Required Skills")
-                                    skills = job_data['skills_desc'].split(',')
-                                    skill_cols = st.columns(3)
-                                    for i, skill in enumerate(skills):
-                                        skill_cols[i % 3].markdown(f"- {skill.strip()}")
+                # One placeholder per recommendation keeps the ranking order while the
+                # detail lookups run concurrently and fill in as each one completes
+                slots = [st.empty() for _ in predicted_jobs]
+                for slot, job in zip(slots, predicted_jobs):
+                    slot.info(f"⏳ Loading details for {job}...")
+                for position, job, job_details, error in iter_job_details(predicted_jobs):
+                    if error is not None:
+                        slots[position].warning(f"⚠️ Details for {job} are not available right now.")
+                    elif job_details is None:
+                        slots[position].empty()
+                    else:
+                        with slots[position].container():
+                            render_job_details(job_details, int(probabilities[position] * 100))
+                
+                # Postings closest to the profile itself, straight from the similarity index.
+                # Optional like the job details: if it times out or fails, the section is left out
+                similar_jobs = None
+                try:
+                    similar = similar_future.result(timeout=SIMILAR_TIMEOUT)
+                    if similar is not None:
+                        job_ids, scores = similar
+                        similar_jobs = get_postings_by_ids(job_ids)
+                except Exception:
+                    similar_jobs = None
+                if similar_jobs is not None:
+                    st.write("### 🔎 Most Similar Postings")
+                    similarity = dict(zip(job_ids, scores))
+                    for _, job_data in similar_jobs.iterrows():
+                        similarity_percentage = int(max(similarity[job_data['job_id']], 0) * 100)
+                        with st.expander(f"💼 {job_data['title']} at {job_data['company_name']} (Similarity: {similarity_percentage}%)"):
+                            # Missing fields are skipped rather than shown as "nan"
+                            details = [job_data[field] for field in ("location", "formatted_experience_level", "formatted_work_type")
+                                       if pd.notna(job_data[field])]
+                            if details:
+                                st.write("📍 " + " · ".join(str(detail) for detail in details))
+                            st.write(job_data['description'])
                 
                 # Career Development Recommendations
                 st.write("### 📚 Career Development Plan")
@@ -253,6 +243,9 @@ elif page == "🚀 Career Explorer":
                         st.write("- Problem-solving Scenarios")
                         st.write("- Team Collaboration")
             
+            except TimeoutError:
+                st.error("⌛ The analysis is taking too long right now.")
+                st.write("Please try again in a moment.")
             except Exception as e:
                 st.error(f"An error occurred: {str(e)}")
                 st.write("Please try again with different input.")
@@ -263,7 +256,7 @@ elif page == "📊 Market Insights":
     st.title("Market Insights")
     st.write("Explore current job market trends and analytics")
     
-    market_data = get_market_insights()
+    market_data = load_market_insights()
     if not market_data.empty:
         # Market Overview
         st.subheader("📈 Market Overview")
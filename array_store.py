@@ -0,0 +1,71 @@
+import os
+import shutil
+
+import numpy as np
+
+MIN_MMAP_BYTES = 4096
+
+
+def source_signature(path):
+    stat = os.stat(path)
+    return np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+
+
+def matches_source(signature, source_path):
+    # True when an export was built from the file now at source_path. Exports
+    # without a signature predate it and are trusted, as is an export whose
+    # source is gone (the export is then the only copy).
+    if signature is None or not os.path.exists(source_path):
+        return True
+    return np.array_equal(signature, source_signature(source_path))
+
+
+def save_arrays(path, source=None, **arrays):
+    # One uncompressed .npy file per array in a directory, so every array can be
+    # memory-mapped on load. The directory is written aside and swapped in whole.
+    # source: the pickle the arrays were exported from; its size and mtime are
+    # stored so a pickle rewritten later is not served through a stale export.
+    if source is not None:
+        arrays["source_signature"] = source_signature(source)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp_path, f"{name}.npy"), np.asarray(array), allow_pickle=False)
+    old_path = None
+    if os.path.exists(path):
+        old_path = f"{path}.old-{os.getpid()}"
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    if old_path is not None:
+        # Processes still mapping the old files keep them until they reload (POSIX);
+        # on Windows mapped files cannot be removed and are left for the next save.
+        if os.path.isdir(old_path):
+            shutil.rmtree(old_path, ignore_errors=True)
+        else:
+            os.remove(old_path)
+
+
+def load_arrays(path, mmap=True):
+    # Read-only memory maps: pages come from the OS page cache, so serving processes
+    # on one host share a single physical copy and loading costs next to nothing.
+    # .npz archives (older exports) cannot be mapped and are read into memory.
+    if os.path.isdir(path):
+        arrays = {}
+        for name in sorted(os.listdir(path)):
+            if not name.endswith(".npy"):
+                continue
+            file_path = os.path.join(path, name)
+            # Files under a page gain nothing from mapping, and scalars cannot be
+            # mapped at all (np.memmap has no 0-d form), so those are read normally
+            mmap_mode = "r" if mmap and os.path.getsize(file_path) >= MIN_MMAP_BYTES else None
+            arrays[name[:-len(".npy")]] = np.load(file_path, mmap_mode=mmap_mode, allow_pickle=False)
+        return arrays
+    with np.load(path, allow_pickle=False) as archive:
+        return {name: archive[name] for name in archive.files}
+
+
+def artifact_bytes(path):
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+    return os.path.getsize(path)
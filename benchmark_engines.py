@@ -0,0 +1,96 @@
+import argparse
+import os
+import pickle
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+from array_store import artifact_bytes
+from centroid_engine import NearestCentroid, build_centroids
+from config import TRAIN_N_JOBS
+from forest_engine import FlatForest, export_forest
+from recommender import top_k
+from train_model import load_training_data, split_features
+
+
+def top_k_accuracy(model, X, y, k):
+    indices, _ = top_k(model.predict_proba(X), k)
+    labels = np.asarray(model.classes_).astype(str)[indices]
+    return float((labels == np.asarray(y).astype(str)[:, None]).any(axis=1).mean())
+
+
+def latency_ms(model, X, single_rows):
+    start = time.perf_counter()
+    model.predict_proba(X)
+    batch_ms = (time.perf_counter() - start) * 1000 / X.shape[0]
+    timings = []
+    for i in range(min(single_rows, X.shape[0])):
+        start = time.perf_counter()
+        model.predict_proba(X[i:i + 1])
+        timings.append((time.perf_counter() - start) * 1000)
+    return batch_ms, float(np.median(timings)), float(np.percentile(timings, 99))
+
+
+def _resident_bytes(model):
+    if isinstance(model, FlatForest):
+        return sum(value.nbytes for value in vars(model).values() if isinstance(value, np.ndarray))
+    if isinstance(model, NearestCentroid):
+        return model.centroids.nbytes + model.classes_.nbytes
+    # Pickle size is a close lower bound for the unpickled forest's node arrays
+    return len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def benchmark(n_estimators=200, single_rows=200):
+    df = load_training_data()
+    _, _, X_train, X_test, y_train, y_test = split_features(df)
+    workdir = tempfile.mkdtemp()
+
+    start = time.perf_counter()
+    forest = RandomForestClassifier(n_estimators=n_estimators, n_jobs=TRAIN_N_JOBS, random_state=42)
+    forest.fit(X_train, y_train)
+    forest_fit = time.perf_counter() - start
+    forest.set_params(n_jobs=None)
+    forest_path = os.path.join(workdir, "forest.pkl")
+    with open(forest_path, "wb") as f:
+        pickle.dump(forest, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    flat_path = os.path.join(workdir, "forest")
+    export_forest(forest, flat_path)
+
+    start = time.perf_counter()
+    centroids = build_centroids(X_train, y_train)
+    centroid_fit = time.perf_counter() - start
+    centroid_path = os.path.join(workdir, "centroids")
+    centroids.save(centroid_path)
+
+    engines = [
+        ("sklearn", forest, forest_path, forest_fit),
+        ("flat_forest", FlatForest.load(flat_path), flat_path, forest_fit),
+        ("centroid", NearestCentroid.load(centroid_path), centroid_path, centroid_fit),
+    ]
+    results = []
+    for name, model, path, fit_seconds in engines:
+        batch_ms, p50_ms, p99_ms = latency_ms(model, X_test, single_rows)
+        results.append({
+            "engine": name,
+            "top1_accuracy": top_k_accuracy(model, X_test, y_test, 1),
+            "top3_accuracy": top_k_accuracy(model, X_test, y_test, 3),
+            "fit_s": round(fit_seconds, 2),
+            "batch_ms_per_row": round(batch_ms, 4),
+            "single_p50_ms": round(p50_ms, 3),
+            "single_p99_ms": round(p99_ms, 3),
+            "artifact_mb": round(artifact_bytes(path) / 1e6, 2),
+            "resident_mb": round(_resident_bytes(model) / 1e6, 2),
+        })
+    return pd.DataFrame(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare recommendation engines on the held-out split")
+    parser.add_argument("--n-estimators", type=int, default=200)
+    parser.add_argument("--single-rows", type=int, default=200, help="rows timed one at a time")
+    args = parser.parse_args()
+    print(benchmark(args.n_estimators, args.single_rows).to_string(index=False))
@@ -0,0 +1,47 @@
+import numpy as np
+
+from array_store import load_arrays, save_arrays
+
+
+def build_centroids(X, y):
+    # Mean TF-IDF vector of every job title, L2-normalized so that a dot product
+    # with an (already L2-normalized) TF-IDF row is the cosine similarity.
+    from scipy import sparse
+
+    classes, codes = np.unique(np.asarray(y).astype(str), return_inverse=True)
+    membership = sparse.csr_matrix(
+        (np.ones(codes.size, dtype=np.float32), (codes, np.arange(codes.size))),
+        shape=(classes.size, codes.size),
+    )
+    centroids = np.asarray((membership @ X).todense(), dtype=np.float32)
+    norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+    centroids /= np.where(norms == 0, 1, norms)
+    return NearestCentroid(classes, centroids)
+
+
+class NearestCentroid:
+    """Cosine nearest-centroid recommender over a dense float32 centroid matrix."""
+
+    def __init__(self, classes, centroids):
+        self.classes_ = classes
+        self.centroids = centroids
+        self.n_features_in_ = centroids.shape[1]
+
+    def save(self, path):
+        save_arrays(path, classes=self.classes_, centroids=self.centroids)
+
+    @classmethod
+    def load(cls, path):
+        arrays = load_arrays(path)
+        return cls(arrays["classes"], arrays["centroids"])
+
+    def predict_proba(self, X):
+        # Cosine similarities, clipped and rescaled per row so they read like the
+        # forest's class probabilities in the UI
+        scores = np.asarray(X @ self.centroids.T, dtype=np.float32)
+        np.maximum(scores, 0, out=scores)
+        totals = scores.sum(axis=1, keepdims=True)
+        return np.divide(scores, totals, out=np.zeros_like(scores), where=totals > 0)
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+# Compact in-memory dtypes for every column loaded from the source CSVs or the
+# training query. Column names mean the same thing in every file, so one map
+# covers them all.
+# - job_id values exceed the int32 range, so they stay int64.
+# - Capitalised (nullable) integer types are used where the data has gaps.
+# - Salaries stay float64 so values written to SQLite are unchanged.
+# Date columns are parsed separately (DATE_PARSERS).
+DTYPES = {
+    # ids
+    "job_id": "int64",
+    "company_id": "Int32",
+    "industry_id": "int32",
+    # counts and flags
+    "views": "Int32",
+    "applies": "Int32",
+    "employee_count": "Int32",
+    "follower_count": "Int32",
+    "inferred": "Int8",
+    "experience_required": "Int16",
+    # low-cardinality text; title, company_name, location and city take too many
+    # distinct values in postings for category codes to save memory, and stay str
+    "pay_period": "category",
+    "formatted_work_type": "category",
+    "formatted_experience_level": "category",
+    "application_type": "category",
+    "work_type": "category",
+    "currency": "category",
+    "compensation_type": "category",
+    "type": "category",
+    "benefit_type": "category",
+    "benefit_category": "category",
+    "industry": "category",
+    "state": "category",
+    "country": "category",
+}
+
+
+def parse_recorded_time(values):
+    # time_recorded holds epoch seconds that were written out as if they were
+    # nanoseconds: "1970-01-01 00:00:01.712346173" is really 1712346173
+    # (2024-04-05). Such values are reinterpreted in one vectorized pass;
+    # genuine datetimes are left alone.
+    parsed = pd.to_datetime(values, format="ISO8601").astype("datetime64[ns]").to_numpy()
+    misread = parsed < np.datetime64("1970-01-02", "ns")
+    fixed = parsed.copy()
+    fixed[misread] = (parsed[misread].view("int64") * 10**9).view("datetime64[ns]")
+    return pd.Series(fixed, index=values.index, name=values.name)
+
+
+# Parsed to datetime64 after reading
+DATE_PARSERS = {"time_recorded": parse_recorded_time}
+
+
+def csv_dtypes(columns=None):
+    # dtype= argument for pd.read_csv; keys missing from the file are ignored
+    if columns is None:
+        return dict(DTYPES)
+    return {column: DTYPES[column] for column in columns if column in DTYPES}
+
+
+def apply_dtypes(df):
+    # Cast a frame that was read without dtypes (SQL results, Arrow batches)
+    # and parse its date columns
+    dtypes = {column: dtype for column, dtype in DTYPES.items()
+              if column in df.columns and df[column].dtype != dtype}
+    if dtypes:
+        df = df.astype(dtypes)
+    for column, parse in DATE_PARSERS.items():
+        if column in df.columns:
+            df[column] = parse(df[column])
+    return df
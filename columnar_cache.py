@@ -0,0 +1,109 @@
+import os
+import time
+
+import pandas as pd
+
+from column_types import apply_dtypes, csv_dtypes
+from config import COLUMNAR_CACHE_DIR
+
+# pyarrow is optional: without it (or without a fresh cache file) every reader
+# below falls back to parsing the CSV.
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    from pyarrow import csv as pa_csv
+    from pyarrow import feather, ipc
+except ImportError:
+    pa = None
+
+# String columns with at most this share of distinct values are dictionary-encoded
+DICTIONARY_RATIO = 0.5
+
+
+def cache_path(csv_path):
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(COLUMNAR_CACHE_DIR, f"{name}.arrow")
+
+
+def _source_metadata(csv_path):
+    stat = os.stat(csv_path)
+    return {b"source_mtime_ns": str(stat.st_mtime_ns).encode(), b"source_size": str(stat.st_size).encode()}
+
+
+def is_fresh(csv_path):
+    path = cache_path(csv_path)
+    if pa is None or not os.path.exists(path):
+        return False
+    with pa.memory_map(path) as source:
+        metadata = ipc.open_file(source).schema.metadata or {}
+    expected = _source_metadata(csv_path)
+    return all(metadata.get(key) == value for key, value in expected.items())
+
+
+def build_cache(csv_path):
+    # Typed, dictionary-encoded Arrow IPC file. Written uncompressed so readers
+    # can memory-map it and slice columns without copying.
+    if pa is None:
+        raise ImportError("pyarrow is required to build the columnar cache")
+    # Empty fields are nulls, as in pandas
+    table = pa_csv.read_csv(csv_path, convert_options=pa_csv.ConvertOptions(strings_can_be_null=True))
+    # Arrow infers ISO timestamps where pandas keeps the raw text; keep the text
+    # so cached and CSV reads load identical values.
+    timestamps = {name: pa.string() for name, kind in zip(table.column_names, table.schema.types)
+                  if pa.types.is_timestamp(kind) or pa.types.is_date(kind)}
+    if timestamps:
+        table = pa_csv.read_csv(csv_path, convert_options=pa_csv.ConvertOptions(
+            column_types=timestamps, strings_can_be_null=True))
+    columns = []
+    for column in table.columns:
+        if pa.types.is_null(column.type):
+            column = column.cast(pa.float64())  # all-empty column; pandas reads these as float
+        elif pa.types.is_string(column.type) and len(column) and \
+                pc.count_distinct(column).as_py() <= DICTIONARY_RATIO * len(column):
+            column = column.dictionary_encode()
+        columns.append(column)
+    table = pa.table(columns, names=table.column_names).replace_schema_metadata(_source_metadata(csv_path))
+    os.makedirs(COLUMNAR_CACHE_DIR, exist_ok=True)
+    tmp_path = cache_path(csv_path) + ".tmp"
+    feather.write_feather(table, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, cache_path(csv_path))
+    return table.num_rows
+
+
+def source_columns(csv_path):
+    if is_fresh(csv_path):
+        with pa.memory_map(cache_path(csv_path)) as source:
+            return ipc.open_file(source).schema.names
+    return list(pd.read_csv(csv_path, nrows=0).columns)
+
+
+def read_table(csv_path, columns=None):
+    # Only the requested columns are read; from the cache they are memory-mapped
+    if is_fresh(csv_path):
+        return apply_dtypes(feather.read_table(cache_path(csv_path), columns=columns, memory_map=True).to_pandas())
+    return apply_dtypes(pd.read_csv(csv_path, usecols=columns, dtype=csv_dtypes(columns)))
+
+
+def iter_chunks(csv_path, columns=None, chunksize=50_000):
+    if is_fresh(csv_path):
+        table = feather.read_table(cache_path(csv_path), columns=columns, memory_map=True)
+        for batch in table.to_batches(max_chunksize=chunksize):
+            yield apply_dtypes(batch.to_pandas())
+        return
+    for chunk in pd.read_csv(csv_path, usecols=columns, dtype=csv_dtypes(columns), chunksize=chunksize):
+        yield apply_dtypes(chunk)
+
+
+if __name__ == "__main__":
+    from store_data import SOURCES
+
+    for _, csv_path, _ in SOURCES:
+        if not os.path.exists(csv_path):
+            print(f"⏭️ {csv_path}: not found")
+            continue
+        if is_fresh(csv_path):
+            print(f"✅ {csv_path}: cache up to date")
+            continue
+        start = time.perf_counter()
+        rows = build_cache(csv_path)
+        print(f"✅ {csv_path}: {rows:,} rows cached in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,55 @@
+import os
+
+# Artifacts written by train_model.py
+MODEL_PATH = os.environ.get("CAREER_MODEL_PATH", "career_recommendation_model.pkl")
+VECTORIZER_PATH = os.environ.get("CAREER_VECTORIZER_PATH", "vectorizer.pkl")
+# Array artifacts are directories of .npy files, memory-mapped read-only on load so
+# every serving process shares one copy (array_store.py); older .npz exports still load.
+# Sorted-array export of the vectorizer used for serving (fast_vectorizer.py)
+FAST_VECTORIZER_PATH = os.environ.get("CAREER_FAST_VECTORIZER_PATH", "vectorizer_arrays")
+FLAT_FOREST_PATH = os.environ.get("CAREER_FLAT_FOREST_PATH", "career_recommendation_forest")
+CENTROID_PATH = os.environ.get("CAREER_CENTROID_PATH", "career_recommendation_centroids")
+ANN_INDEX_PATH = os.environ.get("CAREER_ANN_INDEX_PATH", "postings_ann")
+# Written by train_model.py --streaming (hashed TF-IDF + SGD, trained with partial_fit)
+STREAMING_MODEL_PATH = os.environ.get("CAREER_STREAMING_MODEL_PATH", "career_recommendation_streaming.pkl")
+STREAMING_VECTORIZER_PATH = os.environ.get("CAREER_STREAMING_VECTORIZER_PATH", "vectorizer_streaming.pkl")
+# Largest streaming model (n_classes x n_features float64 weights) train_model.py will fit
+STREAMING_MODEL_MB = int(os.environ.get("CAREER_STREAMING_MODEL_MB", "1024"))
+
+# Engine used to score profiles:
+#   "flat_forest" - the forest exported by forest_engine.py, scored with NumPy only
+#                   (falls back to the pickled model when no export exists)
+#   "sklearn"     - the pickled scikit-learn model
+#   "centroid"    - cosine nearest-centroid over per-title TF-IDF centroids;
+#                   much smaller and faster, see benchmark_engines.py for the accuracy cost
+#   "streaming"   - the out-of-core model from train_model.py --streaming
+MODEL_ENGINE = os.environ.get("CAREER_MODEL_ENGINE", "flat_forest")
+
+# Worker processes for forest training (-1: one per core). Trained models are
+# saved with n_jobs reset, since serving scores a single profile at a time.
+TRAIN_N_JOBS = int(os.environ.get("CAREER_TRAIN_N_JOBS", "-1"))
+
+# Recommendations returned per profile
+TOP_K = int(os.environ.get("CAREER_TOP_K", "3"))
+
+# Typed columnar copies of the source CSVs written by columnar_cache.py
+COLUMNAR_CACHE_DIR = os.environ.get("CAREER_COLUMNAR_CACHE_DIR", ".columnar_cache")
+
+# SQLite database built by store_data.py
+DB_PATH = os.environ.get("CAREER_DB_PATH", "career_guidance.db")
+DB_POOL_SIZE = int(os.environ.get("CAREER_DB_POOL_SIZE", "8"))
+DB_MMAP_SIZE = 256 * 1024 * 1024  # bytes of the file mapped into memory per connection
+DB_CACHE_SIZE_KB = 64 * 1024  # page cache per connection
+DB_STATEMENT_CACHE = 256  # prepared statements kept per connection
+
+# Prediction cache in recommender.py: memory budget and entry lifetime (seconds)
+PREDICTION_CACHE_MB = int(os.environ.get("CAREER_PREDICTION_CACHE_MB", "32"))
+PREDICTION_CACHE_TTL = int(os.environ.get("CAREER_PREDICTION_CACHE_TTL", "3600"))
+
+# Per-stage timeouts (seconds) for the Career Explorer pipeline in pipeline.py
+PREDICT_TIMEOUT = float(os.environ.get("CAREER_PREDICT_TIMEOUT", "10"))
+DETAILS_TIMEOUT = float(os.environ.get("CAREER_DETAILS_TIMEOUT", "5"))
+SIMILAR_TIMEOUT = float(os.environ.get("CAREER_SIMILAR_TIMEOUT", "5"))
+
+# Seconds the Market Insights page reuses its aggregate before re-reading it
+MARKET_INSIGHTS_TTL = int(os.environ.get("CAREER_MARKET_INSIGHTS_TTL", "600"))
@@ -0,0 +1,99 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+from config import DB_CACHE_SIZE_KB, DB_MMAP_SIZE, DB_PATH, DB_POOL_SIZE, DB_STATEMENT_CACHE
+
+
+class ConnectionPool:
+    """Thread-safe pool of read-only SQLite connections shared by all sessions."""
+
+    # Never writes, not even the journal mode: store_data.py switches the database
+    # to WAL when it builds it, and a missing database raises instead of being created.
+
+    def __init__(self, path=DB_PATH, size=DB_POOL_SIZE):
+        self.path = os.path.abspath(path)
+        self.size = size
+        # LIFO so the most recently used (warmest) connection is handed out first
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            f"file:{self.path}?mode=ro",
+            uri=True,
+            check_same_thread=False,
+            cached_statements=DB_STATEMENT_CACHE,
+        )
+        conn.execute(f"PRAGMA mmap_size = {DB_MMAP_SIZE}")
+        conn.execute(f"PRAGMA cache_size = -{DB_CACHE_SIZE_KB}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        return conn
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            can_create = self._created < self.size
+            if can_create:
+                self._created += 1
+        if not can_create:
+            return self._idle.get()
+        try:
+            return self._connect()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._created = 0
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(path=DB_PATH):
+    path = os.path.abspath(path)
+    pool = _pools.get(path)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(path)
+            if pool is None:
+                pool = _pools[path] = ConnectionPool(path)
+    return pool
+
+
+def read_sql(query, params=(), path=DB_PATH):
+    with get_pool(path).connection() as conn:
+        return pd.read_sql_query(query, conn, params=params)
+
+
+def has_table(name, path=DB_PATH):
+    with get_pool(path).connection() as conn:
+        row = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = ? AND type IN ('table', 'view')", (name,)
+        ).fetchone()
+    return row is not None
@@ -0,0 +1,94 @@
+import re
+
+import numpy as np
+from scipy import sparse
+
+from array_store import load_arrays, save_arrays
+from config import FAST_VECTORIZER_PATH, VECTORIZER_PATH
+
+
+class FastTfidf:
+    """Serving-time TF-IDF transform over a sorted term array, producing float32 CSR rows."""
+
+    def __init__(self, terms, idf, token_pattern, lowercase=True, source_signature=None):
+        # terms is sorted, so a term's position is also its column: CountVectorizer
+        # orders the columns of a fitted vocabulary alphabetically.
+        self.terms = terms
+        self.idf = idf
+        self.token_pattern = token_pattern
+        self.lowercase = lowercase
+        self.source_signature = source_signature  # see array_store.matches_source
+        self._findall = re.compile(token_pattern).findall
+        self.n_features = len(terms)
+        # Characters in the longest term; longer tokens can never match one
+        self.max_term_length = terms.dtype.itemsize // np.dtype("U1").itemsize
+
+    @classmethod
+    def from_vectorizer(cls, vectorizer):
+        # Only the configuration train_model.py fits is supported; anything else
+        # would need the full analyzer to reproduce its transform.
+        params = vectorizer.get_params()
+        required = {
+            "analyzer": "word", "ngram_range": (1, 1), "preprocessor": None, "tokenizer": None,
+            "strip_accents": None, "binary": False, "sublinear_tf": False, "norm": "l2", "use_idf": True,
+        }
+        mismatched = [name for name, value in required.items() if params[name] != value]
+        if mismatched:
+            raise ValueError(f"Unsupported vectorizer settings for FastTfidf: {', '.join(mismatched)}")
+        terms = np.array(sorted(vectorizer.vocabulary_))
+        if any(vectorizer.vocabulary_[term] != column for column, term in enumerate(terms)):
+            raise ValueError("Vectorizer columns are not in sorted term order")
+        return cls(terms, np.asarray(vectorizer.idf_, dtype=np.float64), params["token_pattern"], params["lowercase"])
+
+    def save(self, path, source=None):
+        save_arrays(path, source=source, terms=self.terms, idf=self.idf,
+                    token_pattern=np.array(self.token_pattern), lowercase=np.array(self.lowercase))
+
+    @classmethod
+    def load(cls, path):
+        data = load_arrays(path)
+        return cls(data["terms"], data["idf"], str(data["token_pattern"]), bool(data["lowercase"]),
+                   data.get("source_signature"))
+
+    def transform(self, raw_documents):
+        # Tokenize each document with one precompiled findall, then look every
+        # token of the batch up at once with a binary search over the terms.
+        tokens, lengths = [], []
+        for document in raw_documents:
+            found = self._findall(document.lower() if self.lowercase else document)
+            # Dropped before np.array: one very long token (a line of underscores is
+            # a single \w+ match) would widen the fixed-width array of the whole batch
+            found = [token for token in found if len(token) <= self.max_term_length]
+            tokens.extend(found)
+            lengths.append(len(found))
+        n_rows = len(lengths)
+        rows = np.repeat(np.arange(n_rows, dtype=np.int64), lengths)
+        if tokens:
+            tokens = np.array(tokens)
+            columns = np.searchsorted(self.terms, tokens)
+            columns[columns == self.n_features] = 0
+            known = self.terms[columns] == tokens
+            rows, columns = rows[known], columns[known]
+        else:
+            columns = np.empty(0, dtype=np.int64)
+
+        # Term counts per (row, column); the unique keys come back sorted by row, then column
+        keys, counts = np.unique(rows * self.n_features + columns, return_counts=True)
+        rows, columns = keys // self.n_features, keys % self.n_features
+        # Weighted and L2-normalized in float64 as scikit-learn does, stored as float32
+        values = counts * self.idf[columns]
+        norms = np.sqrt(np.bincount(rows, weights=values * values, minlength=n_rows))
+        values /= norms[rows]
+        indptr = np.zeros(n_rows + 1, dtype=np.int32)
+        np.cumsum(np.bincount(rows, minlength=n_rows), out=indptr[1:])
+        return sparse.csr_matrix(
+            (values.astype(np.float32), columns.astype(np.int32), indptr), shape=(n_rows, self.n_features)
+        )
+
+
+if __name__ == "__main__":
+    import joblib
+
+    # Export an existing vectorizer.pkl without retraining
+    FastTfidf.from_vectorizer(joblib.load(VECTORIZER_PATH)).save(FAST_VECTORIZER_PATH, source=VECTORIZER_PATH)
+    print(f"✅ Compact vectorizer saved to {FAST_VECTORIZER_PATH}")
@@ -0,0 +1,202 @@
+import argparse
+
+import joblib
+import numpy as np
+from sklearn.model_selection import train_test_split
+
+from array_store import artifact_bytes, save_arrays
+from config import DB_PATH, FLAT_FOREST_PATH, MODEL_PATH, TOP_K, VECTORIZER_PATH
+from forest_engine import BATCH_SIZE, FlatForest
+from recommender import top_k
+from train_model import load_training_data
+
+MAX_LEAF_CLASSES = 4
+WEIGHT_LEVELS = 255  # leaf probabilities are stored as uint8 multiples of 1/255
+MIN_AGREEMENT = 0.98
+TREE_STEP = 10
+
+
+def compact_tree(tree, max_leaf_classes=MAX_LEAF_CLASSES):
+    # Keep the max_leaf_classes most likely classes of every leaf, renormalized
+    # and quantized to uint8, then collapse sibling leaves whose compressed
+    # distributions are identical: the split between them no longer changes any
+    # prediction. Node ids stay in scikit-learn's pre-order, so the root is 0.
+    n_nodes = tree.node_count
+    left, right = tree.children_left, tree.children_right
+    is_leaf = left == -1
+    m = min(max_leaf_classes, tree.value.shape[2])
+
+    classes = np.full((n_nodes, m), -1, dtype=np.int64)
+    weights = np.zeros((n_nodes, m), dtype=np.uint8)
+    values = tree.value[is_leaf, 0, :]
+    top = np.argpartition(-values, m - 1, axis=1)[:, :m]
+    top_values = np.take_along_axis(values, top, axis=1)
+    quantized = np.rint(top_values / top_values.sum(axis=1, keepdims=True) * WEIGHT_LEVELS).astype(np.uint8)
+    # Canonical entry order (by class, dropped entries last) so equal leaves compare equal
+    order = np.argsort(np.where(quantized > 0, top, np.iinfo(np.int64).max), axis=1)
+    top, quantized = np.take_along_axis(top, order, axis=1), np.take_along_axis(quantized, order, axis=1)
+    classes[is_leaf] = np.where(quantized > 0, top, -1)
+    weights[is_leaf] = quantized
+
+    while True:
+        internal = np.flatnonzero(~is_leaf)
+        l, r = left[internal], right[internal]
+        mergeable = (
+            is_leaf[l] & is_leaf[r]
+            & (classes[l] == classes[r]).all(axis=1) & (weights[l] == weights[r]).all(axis=1)
+        )
+        if not mergeable.any():
+            break
+        merged = internal[mergeable]
+        classes[merged], weights[merged] = classes[left[merged]], weights[left[merged]]
+        is_leaf[merged] = True
+
+    # Drop the nodes below collapsed splits
+    reachable = np.zeros(n_nodes, dtype=bool)
+    frontier = np.array([0])
+    while frontier.size:
+        reachable[frontier] = True
+        frontier = frontier[~is_leaf[frontier]]
+        frontier = np.concatenate([left[frontier], right[frontier]])
+    kept = np.flatnonzero(reachable)
+    new_ids = np.full(n_nodes, -1, dtype=np.int64)
+    new_ids[kept] = np.arange(kept.size)
+    is_leaf = is_leaf[kept]
+    return {
+        "feature": np.where(is_leaf, 0, tree.feature[kept]),
+        "threshold": tree.threshold[kept],
+        "left": np.where(is_leaf, np.arange(kept.size), new_ids[left[kept]]),
+        "right": np.where(is_leaf, np.arange(kept.size), new_ids[right[kept]]),
+        "is_leaf": is_leaf,
+        "leaf_classes": classes[kept][is_leaf],
+        "leaf_weights": weights[kept][is_leaf],
+    }
+
+
+def compact_forest(model, max_leaf_classes=MAX_LEAF_CLASSES):
+    # Same flat layout as forest_engine.export_forest, with sparse uint8 leaves.
+    # Trees, their nodes and their leaves are stored in order, so the first t
+    # trees of the result are a valid smaller forest (see keep_trees).
+    features, thresholds, children, leaf_ids, leaf_classes, leaf_weights, leaf_counts, roots = [], [], [], [], [], [], [], []
+    offset = 0
+    n_leaves = 0
+    for estimator in model.estimators_:
+        tree = compact_tree(estimator.tree_, max_leaf_classes)
+        is_leaf = tree["is_leaf"]
+        children.append(np.stack([tree["left"], tree["right"]], axis=1) + offset)
+        leaf_id = np.full(is_leaf.size, -1, dtype=np.int32)
+        leaf_id[is_leaf] = np.arange(n_leaves, n_leaves + is_leaf.sum())
+        present = tree["leaf_weights"] > 0
+        features.append(tree["feature"])
+        thresholds.append(tree["threshold"])
+        leaf_ids.append(leaf_id)
+        leaf_classes.append(tree["leaf_classes"][present])  # row-major: grouped by leaf
+        leaf_weights.append(tree["leaf_weights"][present])
+        leaf_counts.append(present.sum(axis=1))
+        roots.append(offset)
+        offset += is_leaf.size
+        n_leaves += int(is_leaf.sum())
+
+    n_features = model.n_features_in_
+    n_classes = len(model.classes_)
+    leaf_id = np.concatenate(leaf_ids)
+    return {
+        "feature": np.concatenate(features).astype(np.int16 if n_features <= np.iinfo(np.int16).max else np.int32),
+        "threshold": np.concatenate(thresholds).astype(np.float64),
+        "children": np.concatenate(children).astype(np.int32),
+        "leaf_id": leaf_id,
+        "is_leaf": leaf_id >= 0,
+        "leaf_offsets": np.concatenate([[0], np.cumsum(np.concatenate(leaf_counts))]).astype(np.int64),
+        "leaf_classes": np.concatenate(leaf_classes).astype(np.uint16 if n_classes <= np.iinfo(np.uint16).max else np.int32),
+        "leaf_weights": np.concatenate(leaf_weights),
+        "leaf_scale": np.asarray(1 / WEIGHT_LEVELS),
+        "roots": np.asarray(roots, dtype=np.int32),
+        "n_features": np.asarray(n_features),
+        "classes": np.asarray(model.classes_).astype(str),
+    }
+
+
+def keep_trees(arrays, n_trees):
+    # The first n_trees trees: nodes before the next root, leaves before its first leaf
+    if n_trees >= arrays["roots"].size:
+        return dict(arrays)
+    end = arrays["roots"][n_trees]
+    n_leaves = int(arrays["is_leaf"][:end].sum())
+    kept = dict(arrays)
+    for name in ("feature", "threshold", "children", "leaf_id", "is_leaf"):
+        kept[name] = arrays[name][:end]
+    kept["leaf_offsets"] = arrays["leaf_offsets"][:n_leaves + 1]
+    for name in ("leaf_classes", "leaf_weights"):
+        kept[name] = arrays[name][:kept["leaf_offsets"][-1]]
+    kept["roots"] = arrays["roots"][:n_trees]
+    return kept
+
+
+def top_k_agreement(reference, candidate, k=TOP_K):
+    # Share of rows whose top-k classes are the same set. Zero-probability
+    # classes are left out: which of them fill a short top-k is arbitrary.
+    reference_idx, reference_probs = top_k(reference, k)
+    candidate_idx, candidate_probs = top_k(candidate, k)
+    reference_sets = np.sort(np.where(reference_probs > 0, reference_idx, -1), axis=1)
+    candidate_sets = np.sort(np.where(candidate_probs > 0, candidate_idx, -1), axis=1)
+    return float((reference_sets == candidate_sets).all(axis=1).mean())
+
+
+def validation_rows(db_path=DB_PATH):
+    # The held-out rows of train_model.py's split, vectorized with the saved vectorizer
+    df = load_training_data(db_path)
+    _, test_rows = train_test_split(
+        np.arange(len(df)), test_size=0.2, stratify=df["title"], random_state=42
+    )
+    return joblib.load(VECTORIZER_PATH).transform(df["description"].iloc[test_rows])
+
+
+def compact(model, X, max_leaf_classes=MAX_LEAF_CLASSES, min_agreement=MIN_AGREEMENT, tree_step=TREE_STEP, k=TOP_K):
+    # Returns (arrays, n_trees, agreement) for the fewest trees whose top-k
+    # agreement with the original model on X reaches min_agreement, or
+    # (None, n_trees, agreement) of the full compacted forest when none does.
+    # Random forest trees are fit independently, so a prefix is as good as any subset.
+    reference = model.predict_proba(X)
+    arrays = compact_forest(model, max_leaf_classes)
+    forest = FlatForest(arrays)
+    leaves = np.concatenate([
+        forest.apply(X[start:start + BATCH_SIZE].toarray() if hasattr(X, "toarray") else X[start:start + BATCH_SIZE])
+        for start in range(0, X.shape[0], BATCH_SIZE)
+    ])
+    n_total = forest.roots.size
+    agreement = None
+    for n_trees in sorted({*range(tree_step, n_total, tree_step), n_total}):
+        candidate = np.concatenate([
+            forest.leaf_proba(leaves[start:start + BATCH_SIZE, :n_trees])
+            for start in range(0, X.shape[0], BATCH_SIZE)
+        ])
+        agreement = top_k_agreement(reference, candidate, k)
+        print(f"⏳ {n_trees} trees: top-{k} agreement {agreement:.4f}")
+        if agreement >= min_agreement:
+            return keep_trees(arrays, n_trees), n_trees, agreement
+    return None, n_total, agreement
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compact the trained random forest into a smaller flat_forest artifact"
+    )
+    parser.add_argument("--max-leaf-classes", type=int, default=MAX_LEAF_CLASSES,
+                        help="classes kept per leaf distribution")
+    parser.add_argument("--min-agreement", type=float, default=MIN_AGREEMENT,
+                        help="required top-3 agreement with the original model on held-out rows")
+    parser.add_argument("--tree-step", type=int, default=TREE_STEP, help="tree counts tried in steps of this size")
+    parser.add_argument("--output", default=FLAT_FOREST_PATH)
+    args = parser.parse_args()
+
+    model = joblib.load(MODEL_PATH)
+    X = validation_rows()
+    arrays, n_trees, agreement = compact(model, X, args.max_leaf_classes, args.min_agreement, args.tree_step)
+    if arrays is None:
+        print(f"❌ Top-{TOP_K} agreement {agreement:.4f} is below {args.min_agreement}; "
+              f"try a larger --max-leaf-classes. {args.output} was not changed.")
+        raise SystemExit(1)
+    save_arrays(args.output, source=MODEL_PATH, **arrays)
+    print(f"✅ Compacted {len(model.estimators_)} trees to {n_trees} "
+          f"({artifact_bytes(args.output) / 1e6:.1f}MB, top-{TOP_K} agreement {agreement:.4f}) "
+          f"in {args.output}")
@@ -0,0 +1,146 @@
+import numpy as np
+
+from array_store import load_arrays, save_arrays
+
+BATCH_SIZE = 256
+
+
+def export_forest(model, path, source=None):
+    # Flatten every tree of a fitted RandomForestClassifier into shared arrays.
+    # Node ids are global across trees, so a traversal step is the same gather
+    # for every (row, tree) pair still walking down.
+    features, thresholds, children, leaf_ids, leaf_values, roots = [], [], [], [], [], []
+    offset = 0
+    n_leaves = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        n_nodes = tree.node_count
+        node_ids = np.arange(n_nodes)
+        is_leaf = tree.children_left == -1
+
+        left = np.where(is_leaf, node_ids, tree.children_left) + offset
+        right = np.where(is_leaf, node_ids, tree.children_right) + offset
+        children.append(np.stack([left, right], axis=1))
+        leaf_id = np.full(n_nodes, -1, dtype=np.int32)
+        leaf_id[is_leaf] = np.arange(n_leaves, n_leaves + is_leaf.sum())
+
+        values = tree.value[is_leaf, 0, :]
+        values = values / values.sum(axis=1, keepdims=True)
+
+        features.append(np.where(is_leaf, 0, tree.feature))
+        thresholds.append(tree.threshold)
+        leaf_ids.append(leaf_id)
+        leaf_values.append(values.astype(np.float32))
+        roots.append(offset)
+        offset += n_nodes
+        n_leaves += int(is_leaf.sum())
+
+    leaf_id = np.concatenate(leaf_ids)
+    save_arrays(
+        path,
+        source=source,
+        feature=np.concatenate(features).astype(np.int32),
+        threshold=np.concatenate(thresholds).astype(np.float64),
+        children=np.concatenate(children).astype(np.int32),
+        leaf_id=leaf_id,
+        is_leaf=leaf_id >= 0,
+        leaf_values=np.concatenate(leaf_values),
+        roots=np.asarray(roots, dtype=np.int32),
+        n_features=np.asarray(model.n_features_in_),
+        classes=np.asarray(model.classes_).astype(str),
+    )
+
+
+class FlatForest:
+    """RandomForest scored from flat NumPy arrays, no scikit-learn needed."""
+
+    def __init__(self, arrays):
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.children = arrays["children"]
+        self.leaf_id = arrays["leaf_id"]
+        self.source_signature = arrays.get("source_signature")  # see array_store.matches_source
+        self.roots = arrays["roots"]
+        if "leaf_offsets" in arrays:
+            # Sparse, quantized leaves written by forest_compaction.py: leaf i holds
+            # the (class, weight) entries leaf_offsets[i]:leaf_offsets[i + 1]
+            self.leaf_values = None
+            self.leaf_offsets = arrays["leaf_offsets"]
+            self.leaf_classes = arrays["leaf_classes"]
+            self.leaf_weights = arrays["leaf_weights"]
+            self.leaf_scale = float(arrays["leaf_scale"])
+        else:
+            self.leaf_values = arrays["leaf_values"]
+        # Stored with the export so a mapped forest needs no private per-process copy
+        self.is_leaf = arrays["is_leaf"] if "is_leaf" in arrays else self.leaf_id >= 0
+        self.n_features_in_ = int(arrays["n_features"])
+        self.classes_ = arrays["classes"]
+
+    @classmethod
+    def load(cls, path):
+        return cls(load_arrays(path))
+
+    def apply(self, X):
+        # Leaf reached by every row in every tree, shape (n_rows, n_trees).
+        # Pairs that reach a leaf drop out of the working set, so each step only
+        # gathers for paths that are still descending.
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        values = X.ravel()
+        n_rows, n_trees = X.shape[0], self.roots.size
+        nodes = np.tile(self.roots, n_rows)
+        row_offsets = np.repeat(np.arange(n_rows, dtype=np.int64) * X.shape[1], n_trees)
+        active = np.flatnonzero(~self.is_leaf[nodes])
+        while active.size:
+            current = nodes[active]
+            go_right = values[row_offsets[active] + self.feature[current]] > self.threshold[current]
+            current = self.children[current, go_right.view(np.int8)]
+            nodes[active] = current
+            active = active[~self.is_leaf[current]]
+        return self.leaf_id[nodes].reshape(n_rows, n_trees)
+
+    def predict_proba(self, X):
+        n_rows = X.shape[0]
+        probs = np.empty((n_rows, self.classes_.size), dtype=np.float32)
+        for start in range(0, n_rows, BATCH_SIZE):
+            batch = X[start:start + BATCH_SIZE]
+            # TF-IDF rows arrive as scipy CSR; densify one small batch at a time
+            batch = batch.toarray() if hasattr(batch, "toarray") else batch
+            probs[start:start + BATCH_SIZE] = self.leaf_proba(self.apply(batch))
+        return probs
+
+    def leaf_proba(self, leaves):
+        # Mean class distribution of the given leaves, one row per row of leaves
+        n_rows, n_trees = leaves.shape
+        n_classes = self.classes_.size
+        if self.leaf_values is not None:
+            # Accumulated tree by tree: gathering all trees at once would need an
+            # (n_rows, n_trees, n_classes) block, hundreds of MB with thousands of classes
+            probs = np.zeros((n_rows, n_classes), dtype=np.float32)
+            for tree in range(n_trees):
+                probs += self.leaf_values[leaves[:, tree]]
+            probs /= n_trees
+            return probs
+        # Sparse leaves: scatter-add every entry of every reached leaf into its row
+        starts = self.leaf_offsets[leaves.ravel()]
+        counts = self.leaf_offsets[leaves.ravel() + 1] - starts
+        first = np.cumsum(counts) - counts
+        entries = np.repeat(starts - first, counts) + np.arange(counts.sum())
+        rows = np.repeat(np.arange(n_rows * n_trees) // n_trees, counts)
+        sums = np.bincount(
+            rows * n_classes + self.leaf_classes[entries],
+            weights=self.leaf_weights[entries],
+            minlength=n_rows * n_classes,
+        )
+        return (sums * (self.leaf_scale / n_trees)).astype(np.float32).reshape(n_rows, n_classes)
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+if __name__ == "__main__":
+    import joblib
+
+    from config import FLAT_FOREST_PATH, MODEL_PATH
+
+    export_forest(joblib.load(MODEL_PATH), FLAT_FOREST_PATH, source=MODEL_PATH)
+    print(f"✅ Exported {MODEL_PATH} to {FLAT_FOREST_PATH}")
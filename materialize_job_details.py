@@ -0,0 +1,56 @@
+import sqlite3
+import time
+
+from config import DB_PATH, MODEL_PATH
+from queries import JOB_DETAIL_COLUMNS, search_job_details
+
+
+def materialize_job_details(classes, db_path=DB_PATH):
+    # One lookup row per predictable class, so serving is a primary-key probe
+    # instead of a full-text search plus GROUP BY per recommendation.
+    labels = sorted({str(label) for label in classes})
+    start = time.perf_counter()
+    label_rows, detail_rows = [], []
+    for label in labels:
+        details = search_job_details(label)
+        if details is None:
+            label_rows.append((label, 0))
+            continue
+        label_rows.append((label, len(details)))
+        details = details[JOB_DETAIL_COLUMNS].astype(object).where(details.notna(), None)
+        for rank, values in enumerate(details.itertuples(index=False, name=None)):
+            detail_rows.append((label, rank) + values)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            conn.execute("DROP TABLE IF EXISTS job_details_labels")
+            conn.execute("DROP TABLE IF EXISTS job_details_cache")
+            conn.execute("""
+            CREATE TABLE job_details_labels (
+                class_label TEXT PRIMARY KEY,
+                n_postings INTEGER
+            ) WITHOUT ROWID
+            """)
+            conn.execute(f"""
+            CREATE TABLE job_details_cache (
+                class_label TEXT,
+                rank INTEGER,
+                {", ".join(JOB_DETAIL_COLUMNS)},
+                PRIMARY KEY (class_label, rank)
+            ) WITHOUT ROWID
+            """)
+            conn.executemany("INSERT INTO job_details_labels VALUES (?, ?)", label_rows)
+            placeholders = ", ".join("?" * (len(JOB_DETAIL_COLUMNS) + 2))
+            conn.executemany(f"INSERT INTO job_details_cache VALUES ({placeholders})", detail_rows)
+    finally:
+        conn.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Materialized job details for {len(labels)} classes ({len(detail_rows)} rows) in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    from model_registry import load_artifact
+
+    materialize_job_details(load_artifact(MODEL_PATH).classes_)
@@ -0,0 +1,61 @@
+import hashlib
+import os
+import stat as stat_module
+import threading
+
+import joblib
+
+# Process-wide cache of loaded artifacts. Streamlit re-executes app.py on every
+# widget interaction but keeps imported modules alive, so everything stored here
+# is shared by all reruns and sessions of the server process.
+_lock = threading.Lock()
+_artifacts = {}  # (path, loader) -> (stat signature, sha256 or None, object)
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_artifact(path, loader=joblib.load):
+    path = os.path.abspath(path)
+    key = (path, loader)
+    stat = os.stat(path)
+    is_directory = stat_module.S_ISDIR(stat.st_mode)
+    if is_directory:
+        # Array directories (array_store.py) are only ever replaced whole, so a
+        # new inode or mtime means new content; hashing them would read every
+        # page that loading them is meant to leave unread
+        signature = (stat.st_ino, stat.st_mtime_ns)
+    else:
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+    # Fast path: a single stat() per rerun when nothing changed on disk
+    entry = _artifacts.get(key)
+    if entry is not None and entry[0] == signature:
+        return entry[2]
+
+    with _lock:
+        entry = _artifacts.get(key)
+        if entry is not None and entry[0] == signature:
+            return entry[2]
+        # Hashed only when there is a loaded object to compare against, so the
+        # first load costs nothing extra; the first change after it always reloads
+        digest = None
+        if entry is not None and not is_directory:
+            digest = file_digest(path)
+            if entry[1] == digest:
+                # File was touched or rewritten with identical content, keep the loaded object
+                _artifacts[key] = (signature, digest, entry[2])
+                return entry[2]
+        obj = loader(path)
+        _artifacts[key] = (signature, digest, obj)
+        return obj
+
+
+def clear_artifacts():
+    with _lock:
+        _artifacts.clear()
@@ -0,0 +1,30 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed
+
+from config import DB_POOL_SIZE, DETAILS_TIMEOUT
+from queries import get_job_details
+
+# Shared by every session: imported modules outlive Streamlit reruns. Sized to the
+# connection pool so concurrent lookups never queue for a connection.
+_executor = ThreadPoolExecutor(max_workers=DB_POOL_SIZE, thread_name_prefix="career-pipeline")
+
+
+def submit(fn, *args):
+    return _executor.submit(fn, *args)
+
+
+def iter_job_details(jobs, timeout=DETAILS_TIMEOUT):
+    # Fans one lookup per job out at once and yields (position, job, details, error)
+    # in completion order, so the stage takes as long as the slowest lookup. Jobs
+    # still pending when the stage times out are yielded with a TimeoutError.
+    futures = {_executor.submit(get_job_details, job): (position, job) for position, job in enumerate(jobs)}
+    try:
+        for future in as_completed(futures, timeout=timeout):
+            position, job = futures.pop(future)
+            try:
+                yield position, job, future.result(), None
+            except Exception as e:
+                yield position, job, None, e
+    except TimeoutError as e:
+        for future, (position, job) in futures.items():
+            future.cancel()
+            yield position, job, None, e
@@ -0,0 +1,117 @@
+import hashlib
+import re
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+# scikit-learn's default token pattern. A vectorizer that lowercases and keeps
+# only the tokens its pattern matches gives texts that differ only in case,
+# punctuation or spacing identical vectors, so they can share a cache entry.
+DEFAULT_TOKENIZER = (r"(?u)\b\w\w+\b", True)
+
+ENTRY_OVERHEAD = 256  # approximate bytes per entry beyond its arrays (key, tuple, bookkeeping)
+
+
+def tokenizer_settings(vectorizer):
+    # (token_pattern, lowercase) of a FastTfidf or scikit-learn text vectorizer, or
+    # of the first step of a pipeline such as the streaming one. None when the
+    # tokens do not come from the pattern alone; such text is keyed verbatim.
+    if hasattr(vectorizer, "steps"):
+        vectorizer = vectorizer.steps[0][1]
+    token_pattern = getattr(vectorizer, "token_pattern", None)
+    if (token_pattern is None or getattr(vectorizer, "analyzer", "word") != "word"
+            or getattr(vectorizer, "tokenizer", None) is not None
+            or getattr(vectorizer, "preprocessor", None) is not None):
+        return None
+    return token_pattern, getattr(vectorizer, "lowercase", True)
+
+
+def normalize(text, tokenizer=DEFAULT_TOKENIZER):
+    text = str(text)
+    if tokenizer is None:
+        return text
+    token_pattern, lowercase = tokenizer
+    # NUL-separated: a custom pattern may match tokens that contain spaces
+    return "\0".join(re.findall(token_pattern, text.lower() if lowercase else text))
+
+
+def text_key(text, tokenizer=DEFAULT_TOKENIZER):
+    return hashlib.blake2b(normalize(text, tokenizer).encode(), digest_size=16).digest()
+
+
+def nbytes(value):
+    # Arrays, sparse matrices and (nested) tuples/lists of them
+    if hasattr(value, "indptr"):
+        return value.data.nbytes + value.indices.nbytes + value.indptr.nbytes
+    if hasattr(value, "nbytes"):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(nbytes(item) for item in value)
+    if isinstance(value, str):
+        return len(value)
+    return 0
+
+
+class PredictionCache:
+    """Thread-safe LRU cache with a TTL and a memory budget, shared by all sessions."""
+
+    def __init__(self, max_bytes, ttl):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, size, owner weakrefs, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, *owners):
+        # owners are the artifacts the value was computed with; a reloaded model
+        # or vectorizer is a different object, so its old entries miss.
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (
+                entry[0] < time.monotonic()
+                or len(entry[2]) != len(owners)
+                or any(ref() is not owner for ref, owner in zip(entry[2], owners))
+            ):
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[3]
+
+    def put(self, key, value, *owners):
+        size = nbytes(value) + ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, size, [weakref.ref(owner) for owner in owners], value)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key):
+        self._bytes -= self._entries.pop(key)[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
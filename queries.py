@@ -0,0 +1,161 @@
+import pandas as pd
+
+from db import get_pool, has_table, read_sql
+
+JOB_DETAIL_COLUMNS = [
+    "title", "description", "min_salary", "max_salary",
+    "location", "company_name", "skills_desc", "formatted_experience_level",
+    "remote_allowed", "formatted_work_type", "views", "applies",
+    "avg_min_salary", "avg_max_salary",
+]
+
+JOB_DETAILS_LABEL_SQL = "SELECT n_postings FROM job_details_labels WHERE class_label = ?"
+
+JOB_DETAILS_CACHE_SQL = f"""
+SELECT {", ".join(JOB_DETAIL_COLUMNS)}
+FROM job_details_cache
+WHERE class_label = ?
+ORDER BY rank
+"""
+
+JOB_DETAILS_SEARCH_SQL = """
+SELECT p.title, p.description, p.min_salary, p.max_salary,
+       p.location, p.company_name, p.skills_desc, p.formatted_experience_level,
+       p.remote_allowed, p.formatted_work_type, p.views, p.applies,
+       ROUND(AVG(p.min_salary), 2) as avg_min_salary,
+       ROUND(AVG(p.max_salary), 2) as avg_max_salary
+FROM postings_fts f
+JOIN postings p ON p.job_id = f.rowid
+WHERE postings_fts MATCH ?
+GROUP BY p.title
+ORDER BY MIN(f.rank)
+LIMIT 5
+"""
+
+# Databases built before the full-text index existed
+JOB_DETAILS_LIKE_SQL = """
+SELECT p.title, p.description, p.min_salary, p.max_salary, 
+       p.location, p.company_name, p.skills_desc, p.formatted_experience_level,
+       p.remote_allowed, p.formatted_work_type, p.views, p.applies,
+       ROUND(AVG(p.min_salary), 2) as avg_min_salary,
+       ROUND(AVG(p.max_salary), 2) as avg_max_salary
+FROM postings p
+WHERE p.title LIKE ?
+GROUP BY p.title
+LIMIT 5
+"""
+
+POSTINGS_BY_ID_SQL = f"""
+SELECT p.job_id, {", ".join("p." + column for column in JOB_DETAIL_COLUMNS[:12])}
+FROM postings p
+WHERE p.job_id IN ({{placeholders}})
+"""
+
+MARKET_INSIGHTS_SUMMARY_SQL = "SELECT * FROM market_insights"
+
+MARKET_INSIGHTS_AGGREGATE_SQL = """
+SELECT 
+    formatted_experience_level, 
+    ROUND(AVG(med_salary), 2) as avg_salary,
+    COUNT(*) as job_count,
+    ROUND(AVG(views), 2) as avg_views,
+    ROUND(AVG(applies), 2) as avg_applies
+FROM postings
+WHERE formatted_experience_level IS NOT NULL
+GROUP BY formatted_experience_level
+"""
+
+# Employee/follower counts over time; time_recorded is epoch seconds
+COMPANY_GROWTH_SQL = """
+SELECT time_recorded, employee_count, follower_count
+FROM employee_count_history
+WHERE company_id = ? AND time_recorded BETWEEN ? AND ?
+ORDER BY time_recorded
+"""
+
+TRAINING_SQL = """
+SELECT p.job_id, p.title, p.description, 
+       COALESCE(sal.max_salary, 0) AS max_salary, 
+       COALESCE(sal.min_salary, 0) AS min_salary
+FROM postings p
+LEFT JOIN salaries sal ON p.job_id = sal.job_id
+"""
+
+# Streaming training (train_model.py --streaming) pages through these with a cursor
+STREAMING_TRAINING_SQL = "SELECT job_id, title, description FROM postings WHERE title IS NOT NULL"
+TRAINING_CLASSES_SQL = "SELECT DISTINCT title FROM postings WHERE title IS NOT NULL ORDER BY title"
+
+# (name, sql, sample params, tables - by alias where the query uses one - the
+# query is expected to read in full).
+# store_data.py checks these with EXPLAIN QUERY PLAN after every load.
+HOT_QUERIES = [
+    ("job details label", JOB_DETAILS_LABEL_SQL, ("Data Scientist",), ()),
+    ("job details cache", JOB_DETAILS_CACHE_SQL, ("Data Scientist",), ()),
+    ("job details search", JOB_DETAILS_SEARCH_SQL, ('title : "data scientist"',), ()),
+    ("postings by id", POSTINGS_BY_ID_SQL.format(placeholders="?, ?"), (1, 2), ()),
+    ("market insights", MARKET_INSIGHTS_SUMMARY_SQL, (), ("market_insights_summary",)),
+    ("market insights aggregate", MARKET_INSIGHTS_AGGREGATE_SQL, (), ()),
+    ("company growth", COMPANY_GROWTH_SQL, (1009, 0, 2**31), ()),
+    ("training data", TRAINING_SQL, (), ("p",)),
+    ("streaming training data", STREAMING_TRAINING_SQL, (), ("postings",)),
+    ("training classes", TRAINING_CLASSES_SQL, (), ()),
+]
+
+
+def get_job_details(job_title):
+    # Precomputed by materialize_job_details.py for every class the model can predict
+    if has_table("job_details_labels"):
+        with get_pool().connection() as conn:
+            row = conn.execute(JOB_DETAILS_LABEL_SQL, (str(job_title),)).fetchone()
+            if row is not None:
+                if row[0] == 0:
+                    return None
+                return pd.read_sql_query(JOB_DETAILS_CACHE_SQL, conn, params=(str(job_title),))
+    return search_job_details(job_title)
+
+
+def get_postings_by_ids(job_ids):
+    # Primary-key lookups, returned in the order of job_ids
+    if not job_ids:
+        return None
+    query = POSTINGS_BY_ID_SQL.format(placeholders=", ".join("?" * len(job_ids)))
+    postings = read_sql(query, params=tuple(int(job_id) for job_id in job_ids))
+    if postings.empty:
+        return None
+    order = {job_id: rank for rank, job_id in enumerate(job_ids)}
+    return postings.sort_values("job_id", key=lambda ids: ids.map(order)).reset_index(drop=True)
+
+
+def _title_match_expression(job_title):
+    # Quote the title as a single FTS5 phrase restricted to the title column
+    terms = str(job_title).replace('"', '""').strip()
+    return f'title : "{terms}"' if terms else None
+
+
+def search_job_details(job_title):
+    if not has_table("postings_fts"):
+        return _get_job_details_like(job_title)
+    match = _title_match_expression(job_title)
+    if match is None:
+        return None
+    job_details = read_sql(JOB_DETAILS_SEARCH_SQL, params=(match,))
+    return job_details if not job_details.empty else None
+
+
+def _get_job_details_like(job_title):
+    job_details = read_sql(JOB_DETAILS_LIKE_SQL, params=('%' + str(job_title) + '%',))
+    return job_details if not job_details.empty else None
+
+
+def get_market_insights():
+    # Maintained incrementally by store_data.py; a handful of rows
+    if has_table("market_insights"):
+        return read_sql(MARKET_INSIGHTS_SUMMARY_SQL)
+    return read_sql(MARKET_INSIGHTS_AGGREGATE_SQL)
+
+
+def get_company_growth(company_id, start=0, end=2**63 - 1):
+    # Snapshots between two epoch-second bounds, oldest first
+    growth = read_sql(COMPANY_GROWTH_SQL, params=(int(company_id), int(start), int(end)))
+    growth["time_recorded"] = pd.to_datetime(growth["time_recorded"], unit="s")
+    return growth
@@ -0,0 +1,170 @@
+import argparse
+import itertools
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from centroid_engine import NearestCentroid
+from config import (
+    ANN_INDEX_PATH, CENTROID_PATH, FAST_VECTORIZER_PATH, FLAT_FOREST_PATH, MODEL_ENGINE, MODEL_PATH, PREDICTION_CACHE_MB,
+    PREDICTION_CACHE_TTL, STREAMING_MODEL_PATH, STREAMING_VECTORIZER_PATH, TOP_K, VECTORIZER_PATH,
+)
+from array_store import matches_source
+from fast_vectorizer import FastTfidf
+from forest_engine import FlatForest
+from model_registry import load_artifact
+from prediction_cache import PredictionCache, text_key, tokenizer_settings
+
+BATCH_SIZE = 2048
+
+# Profile vectors and top-k results for single-profile lookups. Streamlit reruns
+# the script on every widget change, so the same text is scored over and over.
+_cache = PredictionCache(PREDICTION_CACHE_MB * 1024 * 1024, PREDICTION_CACHE_TTL)
+
+
+def load_model(engine=MODEL_ENGINE):
+    if engine == "flat_forest" and os.path.exists(FLAT_FOREST_PATH):
+        forest = load_artifact(FLAT_FOREST_PATH, loader=FlatForest.load)
+        # A forest exported from an older pickle is ignored once the model is retrained
+        if matches_source(forest.source_signature, MODEL_PATH):
+            return forest
+    if engine == "centroid":
+        return load_artifact(CENTROID_PATH, loader=NearestCentroid.load)
+    if engine in ("flat_forest", "sklearn"):
+        return load_artifact(MODEL_PATH)
+    if engine == "streaming":
+        return load_artifact(STREAMING_MODEL_PATH)
+    raise ValueError(f"Unknown model engine: {engine!r}")
+
+
+def load_tfidf_vectorizer():
+    # The compact export when train_model.py wrote one; same values, float32 output.
+    # Skipped once vectorizer.pkl has been rewritten without it (e.g. by skill.py).
+    if os.path.exists(FAST_VECTORIZER_PATH):
+        vectorizer = load_artifact(FAST_VECTORIZER_PATH, loader=FastTfidf.load)
+        if matches_source(vectorizer.source_signature, VECTORIZER_PATH):
+            return vectorizer
+    return load_artifact(VECTORIZER_PATH)
+
+
+def load_vectorizer(engine=MODEL_ENGINE):
+    # The streaming model has its own hashed vectorizer; every other engine shares the TF-IDF one
+    if engine == "streaming":
+        return load_artifact(STREAMING_VECTORIZER_PATH)
+    return load_tfidf_vectorizer()
+
+
+def _batches(descriptions, size):
+    iterator = iter(descriptions)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def top_k(probs, k):
+    # argpartition selects the k largest columns per row in linear time; only
+    # those k are then sorted, instead of fully sorting thousands of classes.
+    probs = np.atleast_2d(probs)
+    k = min(k, probs.shape[1])
+    if k <= 0:
+        return np.empty((probs.shape[0], 0), dtype=np.intp), np.empty((probs.shape[0], 0), dtype=probs.dtype)
+    if k < probs.shape[1]:
+        candidates = np.argpartition(probs, -k, axis=1)[:, -k:]
+    else:
+        candidates = np.broadcast_to(np.arange(probs.shape[1]), probs.shape)
+    candidate_probs = np.take_along_axis(probs, candidates, axis=1)
+    order = np.argsort(-candidate_probs, axis=1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(candidate_probs, order, axis=1)
+
+
+def predict_top_k_batch(descriptions, k=TOP_K, model=None, vectorizer=None):
+    # One sparse transform and a single pass over the model for the whole batch.
+    # predict() is not called: its answer is the first column of the top-k.
+    model = model if model is not None else load_model()
+    vectorizer = vectorizer if vectorizer is not None else load_vectorizer()
+    return _top_k_labels(model, vectorizer.transform(descriptions), k)
+
+
+def _top_k_labels(model, X, k):
+    top_indices, top_probs = top_k(model.predict_proba(X), k)
+    return np.asarray(model.classes_)[top_indices], top_probs
+
+
+def predict_top_k(descriptions, k=TOP_K, batch_size=BATCH_SIZE):
+    # Accepts any iterable (e.g. a generator over a candidate dump) and yields
+    # (labels, probabilities) per row without materializing the whole input.
+    model = load_model()
+    vectorizer = load_vectorizer()
+    for batch in _batches(descriptions, batch_size):
+        labels, probs = predict_top_k_batch(batch, k, model, vectorizer)
+        yield from zip(labels, probs)
+
+
+def vectorize(description, vectorizer):
+    key = ("vector", id(vectorizer), text_key(description, tokenizer_settings(vectorizer)))
+    X = _cache.get(key, vectorizer)
+    if X is None:
+        X = vectorizer.transform([description])
+        _cache.put(key, X, vectorizer)
+    return X
+
+
+def predict_job(description, k=TOP_K):
+    model, vectorizer = load_model(), load_vectorizer()
+    key = ("top_k", id(model), id(vectorizer), k, text_key(description, tokenizer_settings(vectorizer)))
+    cached = _cache.get(key, model, vectorizer)
+    if cached is None:
+        labels, probs = _top_k_labels(model, vectorize(description, vectorizer), k)
+        probs = probs[0]
+        probs.flags.writeable = False  # shared by every caller that hits this entry
+        cached = (tuple(str(label) for label in labels[0]), probs)
+        _cache.put(key, cached, model, vectorizer)
+    return list(cached[0]), cached[1]
+
+
+def cache_stats():
+    return _cache.stats()
+
+
+def similar_postings(description, n=5):
+    # Nearest actual postings to the profile text; None until the index is built
+    from similar_jobs import PostingIndex
+
+    if not os.path.exists(ANN_INDEX_PATH):
+        return None
+    index = load_artifact(ANN_INDEX_PATH, loader=PostingIndex.load)
+    # Reuses the vector predict_job cached when the engine shares the TF-IDF vectorizer
+    job_ids, scores = index.search(vectorize(description, load_tfidf_vectorizer()), n)[0]
+    return job_ids.tolist(), scores
+
+
+def score_file(input_path, output_path, column="description", k=TOP_K, batch_size=BATCH_SIZE):
+    start = time.perf_counter()
+    rows = 0
+    model = load_model()
+    vectorizer = load_vectorizer()
+    for chunk_number, chunk in enumerate(pd.read_csv(input_path, chunksize=batch_size)):
+        labels, probs = predict_top_k_batch(chunk[column].fillna("").astype(str).tolist(), k, model, vectorizer)
+        result = chunk.drop(columns=[column])
+        for rank in range(labels.shape[1]):
+            result[f"job_{rank + 1}"] = labels[:, rank]
+            result[f"prob_{rank + 1}"] = probs[:, rank]
+        result.to_csv(output_path, mode="w" if chunk_number == 0 else "a", header=chunk_number == 0, index=False)
+        rows += len(chunk)
+    elapsed = time.perf_counter() - start
+    print(f"✅ Scored {rows:,} profiles in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score a CSV of candidate profiles in batches")
+    parser.add_argument("input", help="CSV file with one profile per row")
+    parser.add_argument("output", help="CSV file to write the top-k recommendations to")
+    parser.add_argument("--column", default="description", help="column holding the profile text")
+    parser.add_argument("--k", type=int, default=TOP_K, help="recommendations per profile")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+    score_file(args.input, args.output, args.column, args.k, args.batch_size)
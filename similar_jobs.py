@@ -0,0 +1,87 @@
+import time
+
+import numpy as np
+
+from array_store import load_arrays, save_arrays
+from recommender import top_k
+
+N_COMPONENTS = 128
+N_PROBE = 8
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def build_posting_index(job_ids, X, path, n_components=N_COMPONENTS, random_state=42):
+    # IVF index over SVD-reduced TF-IDF vectors: postings are clustered with
+    # k-means and stored grouped by cluster, so a query only compares itself
+    # against the few clusters nearest to it.
+    from sklearn.cluster import MiniBatchKMeans
+    from sklearn.decomposition import TruncatedSVD
+
+    start = time.perf_counter()
+    n_components = min(n_components, X.shape[1] - 1)
+    svd = TruncatedSVD(n_components=n_components, random_state=random_state)
+    vectors = _normalize(svd.fit_transform(X)).astype(np.float32)
+
+    n_lists = max(1, int(np.sqrt(vectors.shape[0])))
+    kmeans = MiniBatchKMeans(n_clusters=n_lists, random_state=random_state, n_init=3)
+    assignments = kmeans.fit_predict(vectors)
+    order = np.argsort(assignments, kind="stable")
+    list_offsets = np.concatenate([[0], np.cumsum(np.bincount(assignments, minlength=n_lists))])
+
+    save_arrays(
+        path,
+        components=svd.components_.astype(np.float32),
+        centroids=_normalize(kmeans.cluster_centers_).astype(np.float32),
+        list_offsets=list_offsets.astype(np.int64),
+        job_ids=np.asarray(job_ids, dtype=np.int64)[order],
+        vectors=vectors[order],
+    )
+    elapsed = time.perf_counter() - start
+    print(f"✅ Indexed {vectors.shape[0]:,} postings into {n_lists} lists in {elapsed:.1f}s")
+
+
+class PostingIndex:
+    """Approximate nearest postings for TF-IDF rows, NumPy only."""
+
+    def __init__(self, arrays):
+        self.components = arrays["components"]
+        self.centroids = arrays["centroids"]
+        self.list_offsets = arrays["list_offsets"]
+        self.job_ids = arrays["job_ids"]
+        self.vectors = arrays["vectors"]
+
+    @classmethod
+    def load(cls, path):
+        return cls(load_arrays(path))
+
+    def embed(self, X):
+        return _normalize(np.asarray(X @ self.components.T, dtype=np.float32))
+
+    def search(self, X, n=5, n_probe=N_PROBE):
+        # Returns (job_ids, cosine scores) per query row, best first
+        queries = self.embed(X)
+        probe_lists, _ = top_k(queries @ self.centroids.T, n_probe)
+        results = []
+        for query, lists in zip(queries, probe_lists):
+            candidates = np.concatenate([
+                np.arange(self.list_offsets[i], self.list_offsets[i + 1]) for i in lists
+            ])
+            scores = self.vectors[candidates] @ query
+            best, best_scores = top_k(scores, n)
+            results.append((self.job_ids[candidates[best[0]]], best_scores[0]))
+        return results
+
+
+if __name__ == "__main__":
+    import joblib
+
+    from config import ANN_INDEX_PATH, VECTORIZER_PATH
+    from train_model import load_training_data
+
+    df = load_training_data()
+    vectorizer = joblib.load(VECTORIZER_PATH)
+    build_posting_index(df["job_id"], vectorizer.transform(df["description"]), ANN_INDEX_PATH)
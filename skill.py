@@ -1,11 +1,13 @@
-import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.feature_extraction.text import TfidfVectorizer
 import joblib
 
+from columnar_cache import read_table
+from config import TRAIN_N_JOBS
+
 # Load Data
-df = pd.read_csv("skill_data.csv")
+df = read_table("skill_data.csv")
 
 # Check available columns
 print("Columns in dataset:", df.columns)
@@ -20,8 +22,8 @@ df.rename(columns={"skill": "skills_required"}, inplace=True)
 # Fill missing values in skills column (if any)
 df["skills_required"] = df["skills_required"].fillna("")
 
-# Convert demand to categorical values if it's not numeric
-if df["demand"].dtype == 'object':
+# Convert demand to categorical values if it's not numeric (text reads as object or str)
+if df["demand"].dtype.kind not in "iuf":
     df["demand"] = df["demand"].astype('category').cat.codes
 
 # Feature Extraction using TF-IDF
@@ -33,8 +35,9 @@ y = df["demand"]
 X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
 # Train Model
-model = RandomForestClassifier(n_estimators=100, random_state=42)
+model = RandomForestClassifier(n_estimators=100, n_jobs=TRAIN_N_JOBS, random_state=42)
 model.fit(X_train, y_train)
+model.set_params(n_jobs=None)
 
 # Save Model & Vectorizer
 joblib.dump(model, "career_recommendation_model.pkl")
@@ -1,12 +1,25 @@
+import argparse
+import multiprocessing
+import os
+import queue
 import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 
-# Connect to SQLite Database (Creates if it doesn't exist)
-conn = sqlite3.connect("career_guidance.db")
-cursor = conn.cursor()
+from columnar_cache import iter_chunks, source_columns
+from config import DB_PATH
+from model_registry import file_digest
+
+CHUNK_SIZE = 5_000  # rows parsed at a time per CSV
+BATCH_BYTES = 8 * 1024 * 1024  # approximate in-memory size of one queued row batch
+QUEUE_BATCHES = 2  # row batches buffered between the parsers and the writer
+EPOCH = pd.Timestamp(0)
 
 # Create Tables
-cursor.execute("""
+SCHEMA = [
+    """
 CREATE TABLE IF NOT EXISTS postings (
     job_id INTEGER PRIMARY KEY,
     company_name TEXT,
@@ -40,18 +53,16 @@ CREATE TABLE IF NOT EXISTS postings (
     zip_code TEXT,
     fips TEXT
 )
-""")
-
-cursor.execute("""
+    """,
+    """
 CREATE TABLE IF NOT EXISTS job_skills (
     job_id INTEGER PRIMARY KEY,
     job_title TEXT,
     skill_abr TEXT,
     experience_required INTEGER
 )
-""")
-
-cursor.execute("""
+    """,
+    """
 CREATE TABLE IF NOT EXISTS salaries (
     job_id INTEGER PRIMARY KEY,
     job_title TEXT,
@@ -59,37 +70,55 @@ CREATE TABLE IF NOT EXISTS salaries (
     min_salary REAL,
     currency TEXT
 )
-""")
-
-cursor.execute("""
+    """,
+    """
 CREATE TABLE IF NOT EXISTS job_industries (
-    job_id INTEGER PRIMARY KEY,
-    industry_id INTEGER
+    job_id INTEGER,
+    industry_id INTEGER,
+    PRIMARY KEY (job_id, industry_id)
+) WITHOUT ROWID
+    """,
+    """
+CREATE TABLE IF NOT EXISTS benefit_categories (
+    benefit_category_id INTEGER PRIMARY KEY,
+    benefit_category TEXT UNIQUE
 )
-""")
-
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS benefits (
-    job_id INTEGER PRIMARY KEY,
-    benefit_type TEXT
+    """,
+    """
+CREATE TABLE IF NOT EXISTS benefit_types (
+    benefit_type_id INTEGER PRIMARY KEY,
+    benefit_type TEXT UNIQUE,
+    benefit_category_id INTEGER REFERENCES benefit_categories(benefit_category_id)
 )
-""")
-
-cursor.execute("""
+    """,
+    """
+CREATE TABLE IF NOT EXISTS benefits (
+    job_id INTEGER,
+    benefit_type_id INTEGER REFERENCES benefit_types(benefit_type_id),
+    inferred INTEGER,
+    PRIMARY KEY (job_id, benefit_type_id)
+) WITHOUT ROWID
+    """,
+    """
+CREATE VIEW IF NOT EXISTS benefits_named AS
+SELECT b.job_id, t.benefit_type, c.benefit_category, b.inferred
+FROM benefits b
+JOIN benefit_types t ON t.benefit_type_id = b.benefit_type_id
+LEFT JOIN benefit_categories c ON c.benefit_category_id = t.benefit_category_id
+    """,
+    """
 CREATE TABLE IF NOT EXISTS skills (
     skill_abr TEXT PRIMARY KEY,
     skill_name TEXT
 )
-""")
-
-cursor.execute("""
+    """,
+    """
 CREATE TABLE IF NOT EXISTS industries (
     industry_id INTEGER PRIMARY KEY,
     industry_name TEXT
 )
-""")
-
-cursor.execute("""
+    """,
+    """
 CREATE TABLE IF NOT EXISTS companies (
     company_id INTEGER PRIMARY KEY,
     name TEXT,
@@ -102,71 +131,613 @@ CREATE TABLE IF NOT EXISTS companies (
     address TEXT,
     url TEXT
 )
-""")
-
-cursor.execute("""
+    """,
+    """
 CREATE TABLE IF NOT EXISTS company_industries (
     company_id INTEGER,
     industry TEXT
 )
-""")
-
-cursor.execute("""
+    """,
+    """
 CREATE TABLE IF NOT EXISTS company_specialities (
     company_id INTEGER,
     speciality TEXT
 )
-""")
-
-cursor.execute("""
+    """,
+    """
+CREATE TABLE IF NOT EXISTS employee_count_history (
+    company_id INTEGER,
+    time_recorded INTEGER,
+    employee_count INTEGER,
+    follower_count INTEGER,
+    PRIMARY KEY (company_id, time_recorded)
+) WITHOUT ROWID
+    """,
+    # Latest snapshot per company, derived from employee_count_history
+    """
 CREATE TABLE IF NOT EXISTS employee_counts (
     company_id INTEGER PRIMARY KEY,
     employee_count INTEGER,
     follower_count INTEGER,
-    time_recorded TEXT
+    time_recorded INTEGER
 )
-""")
-
-# Load Data from Preprocessed CSV Files
-df_postings = pd.read_csv("cleaned_postings.csv")
-df_job_skills = pd.read_csv("skill_data.csv")
-df_salaries = pd.read_csv("salaries_data.csv")
-df_job_industries = pd.read_csv("job_industries.csv")
-df_benefits = pd.read_csv("benefits_data.csv")
-df_skills = pd.read_csv("cleaned_skills.csv")
-df_industries = pd.read_csv("cleaned_industries.csv")
-df_companies = pd.read_csv("cleaned_companies.csv")
-df_company_industries = pd.read_csv("cleaned_company_industries.csv")
-df_company_specialities = pd.read_csv("cleaned_company_specialities.csv")
-df_employee_counts = pd.read_csv("cleaned_employee_counts.csv")
-
-# Insert Data into SQLite Tables
-df_postings.to_sql("postings", conn, if_exists="replace", index=False)
-df_job_skills.to_sql("job_skills", conn, if_exists="replace", index=False)
-df_salaries.to_sql("salaries", conn, if_exists="replace", index=False)
-df_job_industries.to_sql("job_industries", conn, if_exists="replace", index=False)
-df_benefits.to_sql("benefits", conn, if_exists="replace", index=False)
-df_skills.to_sql("skills", conn, if_exists="replace", index=False)
-df_industries.to_sql("industries", conn, if_exists="replace", index=False)
-df_companies.to_sql("companies", conn, if_exists="replace", index=False)
-df_company_industries.to_sql("company_industries", conn, if_exists="replace", index=False)
-df_company_specialities.to_sql("company_specialities", conn, if_exists="replace", index=False)
-df_employee_counts.to_sql("employee_counts", conn, if_exists="replace", index=False)
-
-# Commit and Close Connection
-conn.commit()
-conn.close()
-
-print("✅ Data Successfully Stored in SQLite3 Database.")
-import sqlite3
+    """,
+]
+
+# Incremental mode: per source file fingerprint of the last successful load
+WATERMARKS_SQL = """
+CREATE TABLE IF NOT EXISTS ingest_watermarks (
+    source_file TEXT PRIMARY KEY,
+    mtime_ns INTEGER,
+    size INTEGER,
+    sha256 TEXT,
+    rows INTEGER,
+    loaded_at TEXT
+)
+"""
+
+# Tables upserted by key in incremental mode; the other tables are small and
+# are replaced wholesale when their source file changes.
+UPSERT_KEYS = {
+    "postings": ("job_id",),
+    "companies": ("company_id",),
+    "employee_count_history": ("company_id", "time_recorded"),
+    "benefits": ("job_id", "benefit_type_id"),
+}
+
+# Text columns parsed from the CSV that the writer replaces with integer codes
+# from a dictionary table (see BenefitCoder)
+CODED_COLUMNS = {
+    "benefits": ("benefit_type", "benefit_category"),
+}
+
+# (table, source CSV, CSV column -> table column renames)
+SOURCES = [
+    ("postings", "cleaned_postings.csv", {}),
+    ("job_skills", "skill_data.csv", {"skill": "skill_abr"}),
+    ("salaries", "salaries_data.csv", {}),
+    ("job_industries", "job_industries.csv", {}),
+    ("benefits", "benefits_data.csv", {"type": "benefit_type"}),
+    ("skills", "cleaned_skills.csv", {}),
+    ("industries", "cleaned_industries.csv", {}),
+    ("companies", "cleaned_companies.csv", {}),
+    ("company_industries", "cleaned_company_industries.csv", {}),
+    ("company_specialities", "cleaned_company_specialities.csv", {}),
+    ("employee_count_history", "cleaned_employee_counts.csv", {}),
+]
+
+# Derived structures maintained by triggers; they would fire once per row during
+# a bulk load, so they are dropped here and rebuilt in one pass afterwards.
+DERIVED_TRIGGERS = [
+    "postings_fts_ai",
+    "postings_fts_ad",
+    "postings_fts_au",
+    "postings_market_insights_ai",
+    "postings_market_insights_ad",
+    "postings_market_insights_au",
+    "employee_count_history_latest_ai",
+    "employee_count_history_latest_au",
+]
+
+# Secondary indexes for the access paths in queries.HOT_QUERIES. Primary keys
+# (postings.job_id, salaries.job_id, ...) already cover the id lookups and joins.
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_postings_title ON postings(title)",
+    # Covers the experience-level aggregate without touching the wide postings rows
+    "CREATE INDEX IF NOT EXISTS idx_postings_experience "
+    "ON postings(formatted_experience_level, med_salary, views, applies)",
+    # Time-range queries across companies; per-company ranges use the primary key
+    "CREATE INDEX IF NOT EXISTS idx_employee_count_history_time ON employee_count_history(time_recorded)",
+    "CREATE INDEX IF NOT EXISTS idx_employee_counts_time ON employee_counts(time_recorded)",
+]
+
+# Keep the external-content full-text index in step with postings
+POSTINGS_FTS_TRIGGERS_SQL = """
+CREATE TRIGGER IF NOT EXISTS postings_fts_ai AFTER INSERT ON postings BEGIN
+    INSERT INTO postings_fts(rowid, title, description) VALUES (NEW.job_id, NEW.title, NEW.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS postings_fts_ad AFTER DELETE ON postings BEGIN
+    INSERT INTO postings_fts(postings_fts, rowid, title, description)
+    VALUES ('delete', OLD.job_id, OLD.title, OLD.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS postings_fts_au AFTER UPDATE OF job_id, title, description ON postings BEGIN
+    INSERT INTO postings_fts(postings_fts, rowid, title, description)
+    VALUES ('delete', OLD.job_id, OLD.title, OLD.description);
+    INSERT INTO postings_fts(rowid, title, description) VALUES (NEW.job_id, NEW.title, NEW.description);
+END;
+"""
+
+# Market insights summary. Sums and non-null counts (rather than averages) are
+# stored so the triggers below can apply each ingested posting as a delta.
+MARKET_INSIGHTS_SQL = """
+DROP TABLE IF EXISTS market_insights_summary;
+CREATE TABLE market_insights_summary (
+    formatted_experience_level TEXT PRIMARY KEY,
+    job_count INTEGER NOT NULL,
+    salary_sum REAL NOT NULL,
+    salary_n INTEGER NOT NULL,
+    views_sum REAL NOT NULL,
+    views_n INTEGER NOT NULL,
+    applies_sum REAL NOT NULL,
+    applies_n INTEGER NOT NULL
+) WITHOUT ROWID;
+
+INSERT INTO market_insights_summary
+SELECT formatted_experience_level,
+       COUNT(*),
+       TOTAL(med_salary), COUNT(med_salary),
+       TOTAL(views), COUNT(views),
+       TOTAL(applies), COUNT(applies)
+FROM postings
+WHERE formatted_experience_level IS NOT NULL
+GROUP BY formatted_experience_level;
+
+DROP VIEW IF EXISTS market_insights;
+CREATE VIEW market_insights AS
+SELECT formatted_experience_level,
+       ROUND(salary_sum / NULLIF(salary_n, 0), 2) AS avg_salary,
+       job_count,
+       ROUND(views_sum / NULLIF(views_n, 0), 2) AS avg_views,
+       ROUND(applies_sum / NULLIF(applies_n, 0), 2) AS avg_applies
+FROM market_insights_summary
+WHERE job_count > 0;
+
+CREATE TRIGGER IF NOT EXISTS postings_market_insights_ai
+AFTER INSERT ON postings WHEN NEW.formatted_experience_level IS NOT NULL
+BEGIN
+    INSERT INTO market_insights_summary VALUES (
+        NEW.formatted_experience_level, 1,
+        COALESCE(NEW.med_salary, 0), NEW.med_salary IS NOT NULL,
+        COALESCE(NEW.views, 0), NEW.views IS NOT NULL,
+        COALESCE(NEW.applies, 0), NEW.applies IS NOT NULL
+    )
+    ON CONFLICT (formatted_experience_level) DO UPDATE SET
+        job_count = job_count + 1,
+        salary_sum = salary_sum + excluded.salary_sum,
+        salary_n = salary_n + excluded.salary_n,
+        views_sum = views_sum + excluded.views_sum,
+        views_n = views_n + excluded.views_n,
+        applies_sum = applies_sum + excluded.applies_sum,
+        applies_n = applies_n + excluded.applies_n;
+END;
+
+CREATE TRIGGER IF NOT EXISTS postings_market_insights_ad
+AFTER DELETE ON postings WHEN OLD.formatted_experience_level IS NOT NULL
+BEGIN
+    UPDATE market_insights_summary SET
+        job_count = job_count - 1,
+        salary_sum = salary_sum - COALESCE(OLD.med_salary, 0),
+        salary_n = salary_n - (OLD.med_salary IS NOT NULL),
+        views_sum = views_sum - COALESCE(OLD.views, 0),
+        views_n = views_n - (OLD.views IS NOT NULL),
+        applies_sum = applies_sum - COALESCE(OLD.applies, 0),
+        applies_n = applies_n - (OLD.applies IS NOT NULL)
+    WHERE formatted_experience_level = OLD.formatted_experience_level;
+END;
+
+CREATE TRIGGER IF NOT EXISTS postings_market_insights_au
+AFTER UPDATE OF formatted_experience_level, med_salary, views, applies ON postings
+BEGIN
+    UPDATE market_insights_summary SET
+        job_count = job_count - 1,
+        salary_sum = salary_sum - COALESCE(OLD.med_salary, 0),
+        salary_n = salary_n - (OLD.med_salary IS NOT NULL),
+        views_sum = views_sum - COALESCE(OLD.views, 0),
+        views_n = views_n - (OLD.views IS NOT NULL),
+        applies_sum = applies_sum - COALESCE(OLD.applies, 0),
+        applies_n = applies_n - (OLD.applies IS NOT NULL)
+    WHERE formatted_experience_level = OLD.formatted_experience_level;
+    INSERT INTO market_insights_summary
+    SELECT NEW.formatted_experience_level, 1,
+           COALESCE(NEW.med_salary, 0), NEW.med_salary IS NOT NULL,
+           COALESCE(NEW.views, 0), NEW.views IS NOT NULL,
+           COALESCE(NEW.applies, 0), NEW.applies IS NOT NULL
+    WHERE NEW.formatted_experience_level IS NOT NULL
+    ON CONFLICT (formatted_experience_level) DO UPDATE SET
+        job_count = job_count + 1,
+        salary_sum = salary_sum + excluded.salary_sum,
+        salary_n = salary_n + excluded.salary_n,
+        views_sum = views_sum + excluded.views_sum,
+        views_n = views_n + excluded.views_n,
+        applies_sum = applies_sum + excluded.applies_sum,
+        applies_n = applies_n + excluded.applies_n;
+END;
+"""
+
+# Latest employee count snapshot per company. time_recorded is epoch seconds;
+# SQLite returns the other columns from the row holding MAX(time_recorded).
+EMPLOYEE_COUNTS_SQL = """
+DELETE FROM employee_counts;
+
+INSERT INTO employee_counts (company_id, employee_count, follower_count, time_recorded)
+SELECT company_id, employee_count, follower_count, MAX(time_recorded)
+FROM employee_count_history
+GROUP BY company_id;
+
+CREATE TRIGGER IF NOT EXISTS employee_count_history_latest_ai AFTER INSERT ON employee_count_history BEGIN
+    INSERT INTO employee_counts VALUES (NEW.company_id, NEW.employee_count, NEW.follower_count, NEW.time_recorded)
+    ON CONFLICT (company_id) DO UPDATE SET
+        employee_count = excluded.employee_count,
+        follower_count = excluded.follower_count,
+        time_recorded = excluded.time_recorded
+    WHERE excluded.time_recorded >= employee_counts.time_recorded;
+END;
+
+CREATE TRIGGER IF NOT EXISTS employee_count_history_latest_au AFTER UPDATE ON employee_count_history BEGIN
+    UPDATE employee_counts SET
+        employee_count = NEW.employee_count,
+        follower_count = NEW.follower_count
+    WHERE company_id = NEW.company_id AND time_recorded = NEW.time_recorded;
+END;
+"""
+
+
+def _normalized_sql(sql):
+    return " ".join(sql.replace("IF NOT EXISTS ", "").split())
+
+
+def create_tables(conn, migrate=True):
+    # CREATE TABLE IF NOT EXISTS keeps an older definition around; tables whose
+    # declared schema changed are recreated (migrate=True) or reported.
+    changed = []
+    for statement in SCHEMA:
+        if statement.lstrip().startswith("CREATE TABLE"):
+            table = statement.split()[5]
+            row = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+            if row is not None and _normalized_sql(row[0]) != _normalized_sql(statement):
+                changed.append(table)
+                if migrate:
+                    print(f"🔁 {table}: schema changed, recreating")
+                    conn.execute(f"DROP TABLE {table}")
+        conn.execute(statement)
+    conn.execute(WATERMARKS_SQL)
+    conn.commit()
+    return changed
+
+
+class BenefitCoder:
+    """Maps benefit type/category names to their dictionary ids, creating new ones."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.type_ids = dict(conn.execute("SELECT benefit_type, benefit_type_id FROM benefit_types"))
+        self.category_ids = dict(conn.execute("SELECT benefit_category, benefit_category_id FROM benefit_categories"))
+
+    def _category_id(self, category):
+        if category is None:
+            return None
+        if category not in self.category_ids:
+            self.category_ids[category] = self.conn.execute(
+                "INSERT INTO benefit_categories (benefit_category) VALUES (?)", (category,)
+            ).lastrowid
+        return self.category_ids[category]
+
+    def _type_id(self, benefit_type, category):
+        # A missing type is coded like any other name: one NULL-named row whose id
+        # is reloaded on every run, so (job_id, benefit_type_id) upserts still match
+        if benefit_type not in self.type_ids:
+            self.type_ids[benefit_type] = self.conn.execute(
+                "INSERT INTO benefit_types (benefit_type, benefit_category_id) VALUES (?, ?)",
+                (benefit_type, self._category_id(category)),
+            ).lastrowid
+        return self.type_ids[benefit_type]
+
+    def __call__(self, columns, rows):
+        type_at, category_at = columns.index("benefit_type"), columns.index("benefit_category")
+        kept = [i for i, column in enumerate(columns) if column not in ("benefit_type", "benefit_category")]
+        coded_columns = [columns[i] for i in kept] + ["benefit_type_id"]
+        coded_rows = [
+            tuple(row[i] for i in kept) + (self._type_id(row[type_at], row[category_at]),)
+            for row in rows
+        ]
+        return coded_columns, coded_rows
+
+
+def _insert_statement(table, columns, upsert):
+    placeholders = ", ".join("?" * len(columns))
+    keys = UPSERT_KEYS.get(table) if upsert else None
+    if not keys:
+        return f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+    # Only rows whose values actually differ are written (and fire the triggers)
+    values = [column for column in columns if column not in keys]
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders}) "
+        f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET "
+        + ", ".join(f"{column} = excluded.{column}" for column in values)
+        + f" WHERE ({', '.join(f'{table}.{column}' for column in values)})"
+        + f" IS NOT ({', '.join(f'excluded.{column}' for column in values)})"
+    )
+
+
+def _file_signature(csv_path):
+    stat = os.stat(csv_path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def changed_sources(conn, sources=SOURCES):
+    # Sources whose file differs from the last recorded load. mtime/size are
+    # checked first; the content hash only when they moved.
+    changed = []
+    for table, csv_path, renames in sources:
+        row = conn.execute(
+            "SELECT mtime_ns, size, sha256 FROM ingest_watermarks WHERE source_file = ?", (csv_path,)
+        ).fetchone()
+        if row is not None and row[:2] == _file_signature(csv_path):
+            continue
+        if row is not None and row[2] == file_digest(csv_path):
+            continue
+        changed.append((table, csv_path, renames))
+    return changed
+
+
+def record_watermarks(conn, sources, rows_read):
+    with conn:
+        for table, csv_path, _ in sources:
+            mtime_ns, size = _file_signature(csv_path)
+            conn.execute(
+                "INSERT OR REPLACE INTO ingest_watermarks VALUES (?, ?, ?, ?, ?, datetime('now'))",
+                (csv_path, mtime_ns, size, file_digest(csv_path), rows_read[table]),
+            )
+
+
+# Set in every parser process by _init_parser
+_batches = None
+_cancelled = None
+
+
+def _init_parser(batches, cancelled):
+    global _batches, _cancelled
+    _batches, _cancelled = batches, cancelled
+
+
+def _put_batch(batch):
+    # Blocks while the queue is full, and gives up once the writer has failed
+    while not _cancelled.is_set():
+        try:
+            _batches.put(batch, timeout=0.1)
+            return
+        except queue.Full:
+            continue
+    # Batches still buffered for the dead writer must not hold up process exit
+    _batches.cancel_join_thread()
+    raise RuntimeError("load cancelled")
+
+
+def parse_csv(table, csv_path, renames, table_columns, chunksize=CHUNK_SIZE):
+    # Runs in a worker process: parse one CSV in bounded chunks and hand typed
+    # row batches of at most ~BATCH_BYTES to the single writer. The queue holds
+    # QUEUE_BATCHES of them, so memory stays flat no matter how big the CSV is
+    # or how far parsing runs ahead of writing.
+    start = time.perf_counter()
+    rows_read = 0
+    # Only the columns the schema needs are read (from the columnar cache when
+    # fresh), already in the compact dtypes from column_types.py
+    available = source_columns(csv_path)
+    needed = [column for column in available if renames.get(column, column) in table_columns]
+    skipped = [column for column in available if column not in needed]
+    if skipped:
+        print(f"⚠️ {table}: columns not in schema, skipped: {', '.join(skipped)}")
+    for chunk in iter_chunks(csv_path, needed, chunksize):
+        chunk = chunk.rename(columns=renames)
+        columns = list(chunk.columns)
+        chunk_bytes = int(chunk.memory_usage(index=False, deep=True).sum())
+        # SQLite has no datetime type; datetimes are stored as INTEGER epoch seconds
+        for column in chunk.select_dtypes("datetime").columns:
+            chunk[column] = ((chunk[column] - EPOCH) // pd.Timedelta(seconds=1)).astype("Int64")
+        # Python values and None for SQLite. Categorical columns are included: a
+        # categorical cannot hold None, so their gaps would otherwise reach the
+        # writer (and BenefitCoder's dictionaries) as NaN
+        chunk = chunk.astype(object)
+        rows = list(chunk.where(chunk.notna(), None).itertuples(index=False, name=None))
+        # Wide rows (postings descriptions) are split further to stay within BATCH_BYTES
+        step = max(1, len(rows) * BATCH_BYTES // max(chunk_bytes, 1))
+        for offset in range(0, len(rows), step):
+            _put_batch((table, columns, rows[offset:offset + step]))
+        rows_read += len(rows)
+    parse_seconds = time.perf_counter() - start
+    # End marker: queue.put returns before the batch is sent, so a finished
+    # future does not mean every batch has arrived; this message does
+    _put_batch((table, None, (rows_read, parse_seconds)))
+    return table, rows_read, parse_seconds
+
+
+def _write_batches(conn, sources, pending, batches, upsert):
+    rows_read, rows_written, write_seconds = {}, {}, {}
+    coders = {"benefits": BenefitCoder(conn)}
+    with conn:
+        for table, _, _ in sources:
+            rows_written[table], write_seconds[table] = 0, 0.0
+            if not (upsert and table in UPSERT_KEYS):
+                conn.execute(f"DELETE FROM {table}")
+        remaining = set(pending.values())
+        while remaining:
+            try:
+                table, columns, rows = batches.get(timeout=0.1)
+            except queue.Empty:
+                for future in pending:
+                    if future.done():
+                        # Raises here if the parser failed; the transaction is rolled back
+                        future.result()
+                continue
+            if columns is None:
+                rows_read[table], parse_seconds = rows
+                remaining.discard(table)
+                print(f"📥 {table}: {rows_read[table]:,} rows parsed in {parse_seconds:.1f}s")
+                continue
+            write_start = time.perf_counter()
+            if table in coders:
+                columns, rows = coders[table](columns, rows)
+            # rowcount excludes rows written by triggers and upserts that changed nothing
+            rows_written[table] += conn.executemany(_insert_statement(table, columns, upsert), rows).rowcount
+            write_seconds[table] += time.perf_counter() - write_start
+    return rows_read, rows_written, write_seconds
+
+
+def load_sources(conn, sources=SOURCES, workers=None, upsert=False):
+    # SQLite allows a single writer: CSVs are parsed in parallel processes and
+    # every batch is inserted here, inside one transaction for the whole load.
+    # With upsert=True keyed tables are merged instead of replaced.
+    table_columns = {
+        table: [row[1] for row in conn.execute(f"PRAGMA table_info({table})")] + list(CODED_COLUMNS.get(table, ()))
+        for table, _, _ in sources
+    }
+    start = time.perf_counter()
+
+    # A plain multiprocessing queue handed to the parsers at startup: each batch
+    # is pickled once straight to the writer, not relayed through a manager process
+    context = multiprocessing.get_context()
+    batches = context.Queue(maxsize=QUEUE_BATCHES)
+    cancelled = context.Event()
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=context, initializer=_init_parser, initargs=(batches, cancelled)
+    ) as pool:
+        pending = {
+            pool.submit(parse_csv, table, csv_path, renames, table_columns[table]): table
+            for table, csv_path, renames in sources
+        }
+        try:
+            rows_read, rows_written, write_seconds = _write_batches(conn, sources, pending, batches, upsert)
+        except BaseException:
+            # Parsers may be blocked on the full queue; stop them before the pool waits on them
+            cancelled.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    for table, _, _ in sources:
+        if upsert and table in UPSERT_KEYS:
+            print(f"✅ {table}: {rows_written[table]:,} of {rows_read[table]:,} rows new or changed, "
+                  f"upserted in {write_seconds[table]:.1f}s")
+            continue
+        print(f"✅ {table}: {rows_written[table]:,} rows written in {write_seconds[table]:.1f}s")
+        rows_kept = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        if rows_kept != rows_read[table]:
+            print(f"⚠️ {table}: {rows_read[table]:,} rows read, {rows_kept:,} kept (duplicate primary keys replaced)")
+    print(f"✅ Loaded {len(sources)} tables in {time.perf_counter() - start:.1f}s")
+    return rows_read
+
+
+def build_derived(conn):
+    # Full-text index over job titles and descriptions. External content keeps a single
+    # copy of the text in postings; rowid is postings.job_id for the join back.
+    conn.execute("DROP TABLE IF EXISTS postings_fts")
+    conn.execute("""
+    CREATE VIRTUAL TABLE postings_fts USING fts5(
+        title,
+        description,
+        content='postings',
+        content_rowid='job_id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """)
+    conn.execute("INSERT INTO postings_fts(postings_fts) VALUES ('rebuild')")
+    # Rank title hits well above description hits
+    conn.execute("INSERT INTO postings_fts(postings_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0)')")
+    conn.executescript(POSTINGS_FTS_TRIGGERS_SQL)
+
+    conn.executescript(MARKET_INSIGHTS_SQL)
+    conn.executescript(EMPLOYEE_COUNTS_SQL)
+
+
+def optimize(conn, full=True):
+    for statement in INDEXES:
+        conn.execute(statement)
+    # Full statistics after a rebuild; after an incremental load only where they went stale
+    conn.execute("ANALYZE" if full else "PRAGMA optimize")
+    conn.commit()
+
+
+def check_query_plans(conn):
+    # Every hot query must reach its rows through an index: a plain SCAN of a
+    # table is reported unless the query reads that table in full by design.
+    from queries import HOT_QUERIES
+
+    problems = []
+    for name, sql, params, full_reads in HOT_QUERIES:
+        try:
+            plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+        except sqlite3.OperationalError as e:
+            print(f"⏭️ {name}: skipped ({e})")
+            continue
+        scans = [
+            step for step in plan
+            if step.startswith("SCAN ")
+            and "USING COVERING INDEX" not in step
+            and "VIRTUAL TABLE INDEX" not in step
+            and step.split()[1] not in full_reads
+        ]
+        if scans:
+            problems.append(name)
+            print(f"❌ {name}: {'; '.join(scans)}")
+        else:
+            print(f"✅ {name}: {'; '.join(plan)}")
+    return problems
+
+
+def main(workers=None, incremental=False):
+    # Connect to SQLite Database (Creates if it doesn't exist)
+    conn = sqlite3.connect(DB_PATH)
+    # WAL lets the app's read-only connections keep serving while the database is rebuilt
+    conn.execute("PRAGMA journal_mode = WAL")
+    changed = create_tables(conn, migrate=not incremental)
+    if incremental and changed:
+        conn.close()
+        raise SystemExit(f"❌ Schema changed for {', '.join(changed)}; run a full load first.")
+
+    # Load Data from Preprocessed CSV Files
+    if incremental:
+        # Triggers keep the full-text index and market summary current row by row
+        sources = changed_sources(conn)
+        if not sources:
+            print("✅ All source files unchanged since the last load.")
+        else:
+            rows_read = load_sources(conn, sources, workers=workers, upsert=True)
+            record_watermarks(conn, sources, rows_read)
+    else:
+        for trigger in DERIVED_TRIGGERS:
+            conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        rows_read = load_sources(conn, workers=workers)
+        build_derived(conn)
+        record_watermarks(conn, SOURCES, rows_read)
+    optimize(conn, full=not incremental)
+    problems = check_query_plans(conn)
+
+    # Commit and Close Connection
+    conn.commit()
+    conn.close()
+
+    print("✅ Data Successfully Stored in SQLite3 Database.")
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build career_guidance.db from the preprocessed CSV files")
+    parser.add_argument("--workers", type=int, default=None, help="CSV parser processes (default: one per core)")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only load files changed since the last run and upsert postings, companies, "
+             "employee count history and benefits by key",
+    )
+    parser.add_argument("--check-plans", action="store_true", help="only check the hot query plans and exit")
+    args = parser.parse_args()
+    if args.check_plans:
+        conn = sqlite3.connect(DB_PATH)
+        problems = check_query_plans(conn)
+        conn.close()
+        raise SystemExit(1 if problems else 0)
+    problems = main(args.workers, args.incremental)
 
-conn = sqlite3.connect("career_guidance.db")
-cursor = conn.cursor()
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
 
-cursor.execute("PRAGMA table_info(job_skills)")
-columns = cursor.fetchall()
+    cursor.execute("PRAGMA table_info(job_skills)")
+    columns = cursor.fetchall()
 
-for col in columns:
-    print(col)
+    for col in columns:
+        print(col)
 
-conn.close()
+    conn.close()
+    if problems:
+        raise SystemExit(f"❌ Queries without an index path: {', '.join(problems)}")
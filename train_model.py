@@ -1,52 +1,174 @@
+import argparse
 import sqlite3
+import time
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, TfidfVectorizer
+from sklearn.linear_model import SGDClassifier
+from sklearn.pipeline import make_pipeline
 import joblib
 
-# ✅ Step 1: Connect to SQLite Database
-conn = sqlite3.connect("career_guidance.db")
-
-# ✅ Step 2: Fetch Data from Tables
-query = """
-SELECT p.job_id, p.title, p.description, 
-       COALESCE(sal.max_salary, 0) AS max_salary, 
-       COALESCE(sal.min_salary, 0) AS min_salary
-FROM postings p
-LEFT JOIN salaries sal ON p.job_id = sal.job_id
-"""
-
-try:
-    df = pd.read_sql(query, conn)
-    print("✅ Data Loaded Successfully!")
-except Exception as e:
-    print(f"❌ Error Fetching Data: {e}")
-    conn.close()
-    exit()
-
-# ✅ Step 3: Close Database Connection
-conn.close()
-
-# ✅ Step 4: Data Preprocessing
-df.fillna("", inplace=True)  # Fill NaN values
-y = df["title"]  # Target variable (Job Titles)
-
-# ✅ Step 5: Convert Text to Numerical Features
-vectorizer = TfidfVectorizer(stop_words="english", max_features=5000)
-X_vectorized = vectorizer.fit_transform(df["description"])  # Using only description for features
-
-# ✅ Step 6: Train-Test Split
-X_train, X_test, y_train, y_test = train_test_split(
-    X_vectorized, y, test_size=0.2, stratify=y, random_state=42
+from centroid_engine import build_centroids
+from column_types import apply_dtypes
+from fast_vectorizer import FastTfidf
+from config import (
+    ANN_INDEX_PATH, CENTROID_PATH, DB_PATH, FAST_VECTORIZER_PATH, FLAT_FOREST_PATH, MODEL_PATH, STREAMING_MODEL_MB,
+    STREAMING_MODEL_PATH, STREAMING_VECTORIZER_PATH, TRAIN_N_JOBS, VECTORIZER_PATH,
 )
+from forest_engine import export_forest
+from materialize_job_details import materialize_job_details
+from queries import STREAMING_TRAINING_SQL, TRAINING_CLASSES_SQL, TRAINING_SQL
+from similar_jobs import build_posting_index
 
-# ✅ Step 7: Train Random Forest Classifier
-model = RandomForestClassifier(n_estimators=200, random_state=42)
-model.fit(X_train, y_train)
+STREAM_BATCH_SIZE = 5_000
+HASH_FEATURES = 2 ** 14  # the order of the TF-IDF model's 5,000 features; SGD weights are dense per class
+HOLDOUT_MODULUS = 5  # streaming mode holds out postings with job_id % 5 == 0
 
-# ✅ Step 8: Save Model & Vectorizer
-joblib.dump(model, "career_recommendation_model.pkl")
-joblib.dump(vectorizer, "vectorizer.pkl")
 
-print("✅ Career Recommendation Model Trained & Saved Successfully!")
+def load_training_data(db_path=DB_PATH):
+    conn = sqlite3.connect(db_path)
+    try:
+        df = pd.read_sql(TRAINING_SQL, conn)
+    finally:
+        conn.close()
+    df.fillna("", inplace=True)  # Fill NaN values
+    return apply_dtypes(df)
+
+
+def split_features(df):
+    # TF-IDF over the description only; the same split is used by benchmark_engines.py
+    vectorizer = TfidfVectorizer(stop_words="english", max_features=5000)
+    X_vectorized = vectorizer.fit_transform(df["description"])
+    X_train, X_test, y_train, y_test = train_test_split(
+        X_vectorized, df["title"], test_size=0.2, stratify=df["title"], random_state=42
+    )
+    return vectorizer, X_vectorized, X_train, X_test, y_train, y_test
+
+
+def iter_training_batches(db_path=DB_PATH, batch_size=STREAM_BATCH_SIZE):
+    # SQLite steps the query lazily, so only one batch of postings is in memory at a time
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.execute(STREAMING_TRAINING_SQL)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            job_ids, titles, descriptions = zip(*rows)
+            yield (
+                np.array(job_ids, dtype=np.int64),
+                np.array(titles, dtype=object),
+                np.array([description or "" for description in descriptions], dtype=object),
+            )
+    finally:
+        conn.close()
+
+
+def fit_streaming_vectorizer(db_path=DB_PATH, batch_size=STREAM_BATCH_SIZE, n_features=HASH_FEATURES):
+    # Hashed terms need no vocabulary; one pass counting document frequencies
+    # gives the same smoothed IDF weights TfidfVectorizer would learn.
+    hasher = HashingVectorizer(stop_words="english", n_features=n_features, alternate_sign=False, norm=None)
+    document_frequency = np.zeros(n_features, dtype=np.int64)
+    n_documents = 0
+    for job_ids, _, descriptions in iter_training_batches(db_path, batch_size):
+        counts = hasher.transform(descriptions[job_ids % HOLDOUT_MODULUS != 0])
+        document_frequency += np.bincount(counts.indices, minlength=n_features)
+        n_documents += counts.shape[0]
+    tfidf = TfidfTransformer()
+    tfidf.idf_ = np.log((1 + n_documents) / (1 + document_frequency)) + 1
+    return make_pipeline(hasher, tfidf)
+
+
+def train_streaming(db_path=DB_PATH, batch_size=STREAM_BATCH_SIZE, epochs=5, n_features=HASH_FEATURES):
+    # Out-of-core alternative to Steps 1-8: memory is bounded by batch_size and
+    # the model's n_classes x n_features weights, not by the size of postings.
+    conn = sqlite3.connect(db_path)
+    try:
+        classes = np.array([row[0] for row in conn.execute(TRAINING_CLASSES_SQL)], dtype=object)
+    finally:
+        conn.close()
+    # Checked before any pass over postings: coef_ is a dense float64 n_classes x n_features array
+    model_mb = classes.size * n_features * 8 / 1024 / 1024
+    if model_mb > STREAMING_MODEL_MB:
+        raise ValueError(
+            f"{classes.size:,} classes x {n_features:,} features needs a {model_mb:,.0f}MB model, over the "
+            f"{STREAMING_MODEL_MB:,}MB budget (CAREER_STREAMING_MODEL_MB); lower --n-features"
+        )
+    vectorizer = fit_streaming_vectorizer(db_path, batch_size, n_features)
+    model = SGDClassifier(loss="log_loss", alpha=1e-6, random_state=42)
+    rng = np.random.default_rng(42)
+    for epoch in range(epochs):
+        start = time.perf_counter()
+        seen = 0
+        for job_ids, titles, descriptions in iter_training_batches(db_path, batch_size):
+            # Rows arrive in table order; shuffle within the batch
+            rows = rng.permutation(np.flatnonzero(job_ids % HOLDOUT_MODULUS != 0))
+            if len(rows):
+                model.partial_fit(vectorizer.transform(descriptions[rows]), titles[rows], classes=classes)
+                seen += len(rows)
+        print(f"✅ Epoch {epoch + 1}/{epochs}: {seen:,} postings in {time.perf_counter() - start:.1f}s")
+
+    correct = total = 0
+    for job_ids, titles, descriptions in iter_training_batches(db_path, batch_size):
+        held_out = job_ids % HOLDOUT_MODULUS == 0
+        if held_out.any():
+            correct += int((model.predict(vectorizer.transform(descriptions[held_out])) == titles[held_out]).sum())
+            total += int(held_out.sum())
+    print(f"✅ Held-out accuracy on {total:,} postings: {correct / max(total, 1):.3f}")
+
+    joblib.dump(model, STREAMING_MODEL_PATH)
+    joblib.dump(vectorizer, STREAMING_VECTORIZER_PATH)
+    print("✅ Streaming Career Recommendation Model Trained & Saved Successfully!")
+    return model, vectorizer
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the career recommendation models from the SQLite database")
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="page through SQLite and train a hashed TF-IDF + SGD model with partial_fit "
+             "(use with CAREER_MODEL_ENGINE=streaming)",
+    )
+    parser.add_argument("--batch-size", type=int, default=STREAM_BATCH_SIZE, help="postings per streamed batch")
+    parser.add_argument("--epochs", type=int, default=5, help="passes over the postings in streaming mode")
+    parser.add_argument("--n-features", type=int, default=HASH_FEATURES, help="hashed feature columns")
+    args = parser.parse_args()
+    if args.streaming:
+        train_streaming(DB_PATH, args.batch_size, args.epochs, args.n_features)
+        raise SystemExit
+
+    # ✅ Step 1-3: Fetch Data from SQLite Database
+    try:
+        df = load_training_data()
+        print("✅ Data Loaded Successfully!")
+    except Exception as e:
+        print(f"❌ Error Fetching Data: {e}")
+        exit()
+
+    # ✅ Step 4-6: Convert Text to Numerical Features & Train-Test Split
+    vectorizer, X_vectorized, X_train, X_test, y_train, y_test = split_features(df)
+
+    # ✅ Step 7: Train Random Forest Classifier
+    # Trees are built in parallel; see tune_forest.py for choosing the parameters
+    model = RandomForestClassifier(n_estimators=200, n_jobs=TRAIN_N_JOBS, random_state=42)
+    model.fit(X_train, y_train)
+    model.set_params(n_jobs=None)
+
+    # ✅ Step 8: Save Model & Vectorizer
+    joblib.dump(model, MODEL_PATH)
+    joblib.dump(vectorizer, VECTORIZER_PATH)
+    export_forest(model, FLAT_FOREST_PATH, source=MODEL_PATH)  # NumPy-only copy used for serving
+    # Compact transform used for serving, tied to the pickle it was exported from
+    FastTfidf.from_vectorizer(vectorizer).save(FAST_VECTORIZER_PATH, source=VECTORIZER_PATH)
+    build_centroids(X_train, y_train).save(CENTROID_PATH)  # low-latency alternative engine
+
+    print("✅ Career Recommendation Model Trained & Saved Successfully!")
+
+    # ✅ Step 9: Materialize job details for every class the model can predict
+    materialize_job_details(model.classes_)
+
+    # ✅ Step 10: Index posting descriptions for "similar jobs" lookups
+    build_posting_index(df["job_id"], X_vectorized, ANN_INDEX_PATH)
@@ -0,0 +1,116 @@
+import argparse
+import itertools
+import pickle
+import random
+import sqlite3
+import time
+
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+from benchmark_engines import latency_ms, top_k_accuracy
+from config import DB_PATH, TRAIN_N_JOBS
+from train_model import load_training_data, split_features
+
+SEARCH_SPACE = {
+    "max_depth": [None, 20, 40, 80],
+    "min_samples_leaf": [1, 2, 4],
+    "max_features": ["sqrt", "log2", 0.05],
+}
+
+# One row per candidate and run; kept in the main database next to the data it was tuned on
+RESULTS_SQL = """
+CREATE TABLE IF NOT EXISTS forest_tuning_results (
+    run_at TEXT,
+    n_estimators INTEGER,
+    max_depth INTEGER,
+    min_samples_leaf INTEGER,
+    max_features TEXT,
+    fit_s REAL,
+    batch_ms_per_row REAL,
+    single_p50_ms REAL,
+    single_p99_ms REAL,
+    pickle_mb REAL,
+    top1_accuracy REAL,
+    top3_accuracy REAL
+)
+"""
+
+
+def candidates(max_candidates, seed=42):
+    # A fixed random sample of the grid, so the search stays bounded and repeatable
+    grid = [dict(zip(SEARCH_SPACE, values)) for values in itertools.product(*SEARCH_SPACE.values())]
+    random.Random(seed).shuffle(grid)
+    return grid[:max_candidates]
+
+
+def tune(n_estimators=100, max_candidates=12, single_rows=200, n_jobs=TRAIN_N_JOBS, db_path=DB_PATH):
+    df = load_training_data(db_path)
+    _, _, X_train, X_test, y_train, y_test = split_features(df)
+    run_at = time.strftime("%Y-%m-%d %H:%M:%S")
+    results = []
+    for params in candidates(max_candidates):
+        start = time.perf_counter()
+        model = RandomForestClassifier(n_estimators=n_estimators, n_jobs=n_jobs, random_state=42, **params)
+        model.fit(X_train, y_train)
+        fit_seconds = time.perf_counter() - start
+        # Timed the way it is served: one profile at a time, without thread fan-out
+        model.set_params(n_jobs=None)
+        batch_ms, p50_ms, p99_ms = latency_ms(model, X_test, single_rows)
+        result = {
+            "run_at": run_at,
+            "n_estimators": n_estimators,
+            "max_depth": params["max_depth"],
+            "min_samples_leaf": params["min_samples_leaf"],
+            "max_features": str(params["max_features"]),
+            "fit_s": round(fit_seconds, 2),
+            "batch_ms_per_row": round(batch_ms, 4),
+            "single_p50_ms": round(p50_ms, 3),
+            "single_p99_ms": round(p99_ms, 3),
+            "pickle_mb": round(len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)) / 1e6, 2),
+            "top1_accuracy": top_k_accuracy(model, X_test, y_test, 1),
+            "top3_accuracy": top_k_accuracy(model, X_test, y_test, 3),
+        }
+        results.append(result)
+        print(f"✅ {params}: top-1 {result['top1_accuracy']:.3f}, fit {result['fit_s']}s, "
+              f"p99 {result['single_p99_ms']}ms, {result['pickle_mb']}MB")
+
+    results = pd.DataFrame(results).astype({"max_depth": "Int64"})  # None: unlimited
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            conn.execute(RESULTS_SQL)
+            results.to_sql("forest_tuning_results", conn, if_exists="append", index=False)
+    finally:
+        conn.close()
+    return results
+
+
+def best_within(results, latency_budget_ms):
+    # Most accurate candidate whose single-profile p99 fits the budget; ties go to the faster one
+    fits = results[results["single_p99_ms"] <= latency_budget_ms]
+    if fits.empty:
+        return None
+    return fits.sort_values(["top1_accuracy", "single_p99_ms"], ascending=[False, True]).iloc[0]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search random forest parameters against a latency budget")
+    parser.add_argument("--n-estimators", type=int, default=100)
+    parser.add_argument("--max-candidates", type=int, default=12, help="parameter sets sampled from the grid")
+    parser.add_argument("--single-rows", type=int, default=200, help="rows timed one at a time")
+    parser.add_argument("--n-jobs", type=int, default=TRAIN_N_JOBS, help="tree-building processes (-1: all cores)")
+    parser.add_argument("--latency-budget-ms", type=float, default=None, help="single-profile p99 budget")
+    args = parser.parse_args()
+
+    results = tune(args.n_estimators, args.max_candidates, args.single_rows, args.n_jobs)
+    print(results.sort_values("top1_accuracy", ascending=False).to_string(index=False))
+    print("✅ Results appended to forest_tuning_results.")
+    if args.latency_budget_ms is not None:
+        best = best_within(results, args.latency_budget_ms)
+        if best is None:
+            print(f"❌ No candidate meets a {args.latency_budget_ms}ms p99 budget.")
+        else:
+            print(f"✅ Best within {args.latency_budget_ms}ms: max_depth={best['max_depth']}, "
+                  f"min_samples_leaf={best['min_samples_leaf']}, max_features={best['max_features']} "
+                  f"(top-1 {best['top1_accuracy']:.3f}, p99 {best['single_p99_ms']}ms)")